@@ -0,0 +1,248 @@
+import asyncio
+from typing import Tuple
+
+import aiohttp
+
+from . import exceptions
+from .filters import Filter
+from .interaction import MAX_BATCH_SIZE, BaseInteraction, GenericInteraction, chunks
+from .manager import _get_create_data, _set_created_ids
+
+DEFAULT_CONNECTIONS_LIMIT = 100
+# methods of GenericInteraction that AsyncGenericInteraction reimplements
+_INTERACTION_METHODS = ("get_list", "get_all", "get", "create", "update", "create_many", "update_many")
+
+
+class AsyncBaseInteraction(BaseInteraction):
+    """
+    asyncio counterpart of BaseInteraction built on top of aiohttp
+
+    The session (and its connection pool) is created lazily inside the running loop,
+    so interaction instances could be created on import time as the sync ones
+    """
+
+    def __init__(self, *args, session=None, connections_limit=DEFAULT_CONNECTIONS_LIMIT, **kwargs):
+        super().__init__(*args, session=session, **kwargs)
+        self._connections_limit = connections_limit
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._connections_limit))
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self, method, path, data=None, params=None, headers=None):
+        headers = headers or {}
+        headers.update(self._default_headers)
+        headers.update(await self._get_auth_headers_async())
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        if data is not None:
+            data = self._codec.dumps(data)
+            headers["Content-Type"] = self._codec.content_type
+        attempt, auth_retried = 0, False
+        while True:
+            await self._acquire_rate_limit()
+            try:
+                async with self._get_session().request(
+                    method, self._get_url(path), data=data, params=params, headers=headers
+                ) as response:
+                    if response.status == 401 and not auth_retried:
+                        self._token_manager.reset_cache()
+                        headers.update(await self._get_auth_headers_async())
+                        auth_retried = True
+                        continue
+                    if attempt < self._retries and self._is_retryable(method, response.status):
+                        delay = self._get_retry_delay(attempt, response.headers.get("Retry-After"))
+                    else:
+                        return await self._process_response(response)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) as e:
+                if attempt >= self._retries or method.lower() == "post":
+                    raise exceptions.AmoApiException(str(e))
+                delay = self._get_retry_delay(attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get_auth_headers_async(self):
+        token = self._token_manager.get_cached_access_token()
+        if token is None:
+            # reading the storage and refreshing the token block on locks and network
+            token = await asyncio.get_running_loop().run_in_executor(None, self._token_manager.get_access_token)
+        return {"Authorization": "Bearer " + token}
+
+    async def _acquire_rate_limit(self):
+        if self._rate_limiter is None:
+            return
+        scope = self._token_manager.subdomain
+        while True:
+            if self._rate_limiter.is_shared:
+                delay = await asyncio.get_running_loop().run_in_executor(None, self._rate_limiter.try_acquire, scope)
+            else:
+                delay = self._rate_limiter.try_acquire(scope)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    async def _process_response(self, response):
+        if response.status == 204:
+            return None, 204
+        if response.status < 300 or response.status == 400:
+            return self._codec.loads(await response.read()), response.status
+        self._raise_for_status(response.status, await response.text())
+
+    async def request(self, method, path, data=None, params=None, headers=None, include=None):
+        return await self._request(method, path, data=data, params=self._get_params(params, include), headers=headers)
+
+    async def _list(self, path, page, include=None, limit=250, query=None, filters: Tuple[Filter] = (), order=None):
+        params = self._get_list_params(page, limit=limit, query=query, filters=filters, order=order)
+        return await self.request("get", path, params=params, include=include)
+
+    async def _all(self, path, include=None, query=None, filters: Tuple[Filter] = (), order=None, limit=250):
+        page = 1
+        while True:
+            response, _ = await self._list(
+                path, page, include=include, query=query, filters=filters, order=order, limit=limit
+            )
+            if response is None:
+                return
+            yield response["_embedded"]
+            if not self._has_next(response):
+                return
+            page += 1
+
+
+class AsyncGenericInteraction(AsyncBaseInteraction, GenericInteraction):
+    async def get_list(self, page, include=None, limit=250, query=None, filters=None, order=None):
+        response, _ = await self._list(
+            self._get_path(), page, include=include, limit=limit, query=query, filters=filters, order=order
+        )
+        return response["_embedded"][self._get_field()]
+
+    async def get_all(self, include=None, query=None, filters=(), order=None):
+        async for data in self._all(
+            self._get_path(), include=include, query=query, filters=filters, order=order, limit=self.limit
+        ):
+            for item in data[self._get_field()]:
+                yield item
+
+    async def get(self, object_id, include=None):
+        path = "{}/{}".format(self._get_path(), object_id)
+        response, status = await self.request("get", path, include=include)
+        if status == 204:
+            raise exceptions.NotFound()
+        return response
+
+    async def create(self, data):
+        return (await self.create_many([data]))[0]
+
+    async def update(self, object_id, data):
+        path = "{}/{}".format(self._get_path(), object_id)
+        response, status = await self.request("patch", path, data=data)
+        if status == 400:
+            raise exceptions.ValidationError(response)
+        return response
+
+    async def create_many(self, data):
+        assert len(data) <= MAX_BATCH_SIZE
+        response, status = await self.request("post", self._get_path(), data=data)
+        if status == 400:
+            raise exceptions.ValidationError(response)
+        return response["_embedded"][self._get_field()]
+
+    async def update_many(self, data):
+        assert len(data) <= MAX_BATCH_SIZE
+        response, status = await self.request("patch", self._get_path(), data=data)
+        if status == 400:
+            raise exceptions.ValidationError(response)
+        return response["_embedded"][self._get_field()]
+
+
+class AsyncManager:
+    """
+    Manager for any model, but with awaitable methods:
+
+        contacts = AsyncManager.for_model(Contact)
+        contact = await contacts.get(3)
+        async for lead in AsyncManager.for_model(Lead).filter(query="test"):
+            ...
+
+    Instances are the regular models, so reading fields works as usual,
+    but fields that make requests (links, lazy lists) still use the sync manager
+    """
+
+    def __init__(self, interaction, model):
+        self._interaction = interaction
+        self._model = model
+
+    @classmethod
+    def for_model(cls, model, **kwargs):
+        """
+        Manager with the path, field and page limit of the model interaction.
+        Interactions with their own requests logic (users, statuses, calls, ...) can't be converted
+        """
+        interaction = model.objects._interaction
+        overridden = [
+            name
+            for name in _INTERACTION_METHODS
+            if getattr(type(interaction), name, None) is not getattr(GenericInteraction, name)
+        ]
+        if overridden:
+            raise TypeError(
+                "{} overrides {}, so it can't be used with AsyncManager".format(
+                    type(interaction).__name__, ", ".join(overridden)
+                )
+            )
+        async_interaction = AsyncGenericInteraction(
+            path=interaction._get_path(), field=interaction._get_field(), **kwargs
+        )
+        async_interaction.limit = interaction.limit
+        return cls(async_interaction, model=model)
+
+    async def close(self):
+        await self._interaction.close()
+
+    async def create(self, data=None, **kwargs):
+        return self._model(data=await self._interaction.create(data=data or kwargs))
+
+    async def update(self, object_id, data=None, **kwargs):
+        return await self._interaction.update(object_id=object_id, data=data or kwargs)
+
+    async def bulk_create(self, models, batch_size=MAX_BATCH_SIZE):
+        models = list(models)
+        for batch in chunks(models, batch_size):
+            _set_created_ids(batch, await self._interaction.create_many(_get_create_data(batch)))
+        return models
+
+    async def bulk_update(self, models, batch_size=MAX_BATCH_SIZE):
+        models = [instance for instance in models if instance._updated_fields]
+        for batch in chunks(models, batch_size):
+            await self._interaction.update_many(
+                [{"id": instance.id, **instance._get_updated_data()} for instance in batch]
+            )
+            for instance in batch:
+                instance._updated_fields = set()
+        return models
+
+    async def get(self, object_id=None, query=None):
+        if object_id is not None:
+            data = await self._interaction.get(object_id, include=self._model._get_embedded_fields())
+            return self._model(data=data)
+        async for instance in self.filter(query=query):
+            return instance
+        raise exceptions.NotFound()
+
+    async def filter(self, *args, **kwargs):
+        async for data in self._interaction.get_all(*args, include=self._model._get_embedded_fields(), **kwargs):
+            yield self._model(data=data)
+
+    def all(self):
+        return self.filter()
@@ -0,0 +1,157 @@
+import re
+import sqlite3
+import threading
+import time
+from fnmatch import fnmatch
+from urllib.parse import urlencode
+
+# paths of reference data that rarely changes and its ttl in seconds
+DEFAULT_TTLS = {
+    "account": 3600,
+    "users*": 3600,
+    "leads/pipelines*": 3600,
+    "*/custom_fields": 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    body BLOB,
+    etag TEXT,
+    expire_at REAL NOT NULL
+)
+"""
+_ID_SEGMENT = re.compile(r"/\d+(/.*)?$")
+
+
+class ResponseCache:
+    """
+    Persistent cache of GET responses (sqlite) for paths with a ttl. Expired responses with ETag
+    are revalidated with If-None-Match, so an unchanged response is not downloaded again.
+
+    It does nothing until configured, the same way as the default token manager:
+
+        cache.default_response_cache("/var/cache/amocrm.sqlite", ttls={"users*": 600})
+
+    Paths are matched as shell patterns, the first matched ttl is used
+    """
+
+    def __init__(self, path=None, ttls=None):
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self(path, ttls=ttls)
+
+    def __call__(self, path, ttls=None):
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute(_SCHEMA)
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = connection
+            self._ttls = DEFAULT_TTLS if ttls is None else ttls
+
+    def get_ttl(self, path):
+        if self._connection is None:
+            return None
+        for pattern, ttl in self._ttls.items():
+            if fnmatch(path, pattern):
+                return ttl
+        return None
+
+    @staticmethod
+    def get_key(account, path, params=None):
+        params = sorted((key, value) for key, value in (params or {}).items() if value is not None)
+        return "{}:{}?{}".format(account, path, urlencode(params, doseq=True))
+
+    def get(self, key):
+        """
+        Return status, body, etag and whether the response is still fresh or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, body, etag, expire_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, body, etag, expire_at = row
+        return status, body, etag, expire_at > time.time()
+
+    def set(self, key, path, status, body, etag, ttl):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, path, status, body, etag, time.time() + ttl),
+            )
+
+    def touch(self, key, ttl):
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE responses SET expire_at = ? WHERE key = ?", (time.time() + ttl, key))
+
+    def invalidate(self, account, path=""):
+        """
+        Drop responses of the collection the path belongs to (leads/pipelines/1/statuses -> leads/pipelines*)
+        """
+        if self._connection is None:
+            return
+        prefix = "{}:{}".format(account, _ID_SEGMENT.sub("", path))
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+
+
+default_response_cache = ResponseCache()
+
+
+class TTLCache:
+    """
+    In-memory values by key loaded with `load(key)` once per ttl, concurrent callers wait for one load:
+
+        schemas = TTLCache(load=get_schema, ttl=300)
+        schemas.get("leads")
+    """
+
+    def __init__(self, load, ttl):
+        self._load = load
+        self._ttl = ttl
+        self._items = {}  # key -> (loaded_at, value)
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, cached):
+        return cached is not None and time.monotonic() < cached[0] + self._ttl
+
+    def _set(self, key):
+        value = self._load(key)
+        self._items[key] = (time.monotonic(), value)
+        return value
+
+    def get(self, key=None):
+        cached = self._items.get(key)
+        if self._is_fresh(cached):
+            return cached[1]
+        with self._lock:
+            cached = self._items.get(key)
+            if self._is_fresh(cached):
+                return cached[1]
+            return self._set(key)
+
+    def reload(self, key=None, min_interval=0):
+        """
+        Load the value again unless it was loaded less than min_interval seconds ago
+        """
+        with self._lock:
+            cached = self._items.get(key)
+            if self._is_fresh(cached) and time.monotonic() < cached[0] + min_interval:
+                return cached[1]
+            return self._set(key)
+
+    def invalidate(self, *keys):
+        """
+        Forget values of the keys or all values
+        """
+        with self._lock:
+            if not keys:
+                self._items.clear()
+            for key in keys:
+                self._items.pop(key, None)
@@ -5,8 +5,6 @@ from slugify import slugify as _slugify
 
 from . import tokens
 from .entity import company, contact, custom_field, lead
-from .interaction import GenericInteraction
-from .manager import Manager
 from .model import Model
 
 getenv = os.getenv
@@ -66,13 +64,7 @@ def render_model(model: Type[Model], enums=True):
 
 
 def get_fields_for(model: Type[Model]) -> Iterable[custom_field.CustomFieldModel]:
-    return Manager(
-        GenericInteraction(
-            path=f"{model.objects._interaction.path}/custom_fields",
-            field="custom_fields",
-        ),
-        model=custom_field.CustomFieldModel,
-    ).all()
+    return custom_field.custom_fields_registry.get_fields(model.objects._interaction.path)
 
 
 def render_field(field: custom_field.CustomFieldModel, enums=True) -> str:
@@ -0,0 +1,47 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JsonCodec:
+    """
+    Encodes request bodies and decodes responses with the stdlib json
+    """
+
+    content_type = "application/json"
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Same as JsonCodec, but several times faster (pip install orjson)
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required for OrjsonCodec (pip install orjson)")
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return orjson.dumps(data)
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+def get_default_codec():
+    return OrjsonCodec() if orjson is not None else JsonCodec()
+
+
+default_codec = get_default_codec()
@@ -0,0 +1,48 @@
+import json
+
+
+class Cursor:
+    """
+    Position of get_all/Manager.filter iteration, which could be saved and passed back to resume:
+
+        cursor = Cursor()
+        for lead in Lead.objects.filter(query="test", cursor=cursor):
+            process(lead)
+            storage.save("leads-export", cursor.to_dict())
+
+        cursor = Cursor.from_dict(storage.get("leads-export"))
+        for lead in Lead.objects.filter(cursor=cursor):  # continues after the last yielded lead
+            ...
+
+    Resumed iteration uses the path and params of the saved one
+    """
+
+    def __init__(self, path=None, params=None, page=1, last_id=None, finished=False):
+        self.path = path
+        self.params = params
+        self.page = page
+        self.last_id = last_id
+        self.finished = finished
+
+    def __repr__(self):
+        return "Cursor(path={self.path}, page={self.page}, last_id={self.last_id})".format(self=self)
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "params": self.params,
+            "page": self.page,
+            "last_id": self.last_id,
+            "finished": self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def loads(cls, data):
+        return cls.from_dict(json.loads(data))
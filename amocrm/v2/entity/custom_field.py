@@ -1,7 +1,7 @@
-from collections import namedtuple
 from datetime import datetime
 
 from .. import fields, manager, model
+from ..cache import TTLCache
 from ..interaction import GenericInteraction
 
 TEXT = "text"  # Текст
@@ -24,6 +24,8 @@ MULTITEXT = "multitext"
 # CATEGORY = "category" # Категория
 # ITEMS = "items"  # Предметы
 
+DEFAULT_SCHEMA_TTL = 300  # seconds
+
 
 class SelectValue:
     def __init__(self, id=None, value=None):
@@ -58,25 +60,23 @@ class CustomFieldModel(model.Model):
     enums = fields._Field("enums", blank=True)
 
     @classmethod
-    def get_for(cls, instance):
+    def get_manager(cls, path):
         return manager.Manager(
             GenericInteraction(
-                path=f"{instance._path}/custom_fields",
+                path=f"{path}/custom_fields",
                 field="custom_fields",
             ),
             model=CustomFieldModel,
-        ).all()
+        )
+
+    @classmethod
+    def get_for(cls, instance):
+        return cls.get_manager(instance._path).all()
 
     @classmethod
     def create_for(cls, instance, name, code=None, sort=None):
-        return (
-            manager.Manager(
-                GenericInteraction(
-                    path=f"{instance._path}/custom_fields",
-                    field="custom_fields",
-                ),
-                model=CustomFieldModel,
-            )
+        code = (
+            cls.get_manager(instance._path)
             .create(
                 name=name,
                 code=code,
@@ -84,11 +84,65 @@ class CustomFieldModel(model.Model):
             )
             .code
         )
+        custom_fields_registry.invalidate(instance._path)
+        return code
+
+
+class _Schema:
+    def __init__(self, fields_):
+        self.fields = fields_
+        self.by_id = {}
+        self.by_name = {}
+        self.by_code = {}
+        self.enums = {}  # field id -> {enum value: enum id}
+        for field in fields_:
+            self.by_id[field.id] = field
+            self.by_name.setdefault(field.name, field)
+            if field.code:
+                self.by_code.setdefault(field.code, field)
+            self.enums[field.id] = {enum["value"]: enum["id"] for enum in field.enums or ()}
+
+
+class CustomFieldsRegistry:
+    """
+    Custom fields definitions of every entity type (leads, contacts, ...) requested once per ttl
+
+        custom_fields_registry.find("leads", name="UTM метка")
+        custom_fields_registry.invalidate("leads")  # after fields were changed in amocrm
+    """
+
+    def __init__(self, ttl=DEFAULT_SCHEMA_TTL):
+        self._schemas = TTLCache(load=lambda path: _Schema(list(CustomFieldModel.get_manager(path).all())), ttl=ttl)
+
+    def _get_schema(self, path) -> _Schema:
+        return self._schemas.get(path)
+
+    def get_fields(self, path):
+        return self._get_schema(path).fields
+
+    def find(self, path, name=None, code=None, field_id=None):
+        schema = self._get_schema(path)
+        if field_id is not None and field_id in schema.by_id:
+            return schema.by_id[field_id]
+        return schema.by_name.get(name) or schema.by_code.get(code)
+
+    def get_enums(self, path, field_id):
+        return self._get_schema(path).enums.get(field_id, {})
+
+    def invalidate(self, path=None):
+        if path is None:
+            self._schemas.invalidate()
+        else:
+            self._schemas.invalidate(path)
+
+
+custom_fields_registry = CustomFieldsRegistry()
 
 
 class BaseCustomField(fields._BaseField, metaclass=_FieldsRegisterMeta):
     _real_code = None
     type = None
+    is_custom = True
 
     def __init__(self, name, code=None, auto_create=False, field_id=None, **kwargs):
         super().__init__("custom_fields_values", blank=True)
@@ -99,10 +153,7 @@ class BaseCustomField(fields._BaseField, metaclass=_FieldsRegisterMeta):
         self._auto_create = auto_create
 
     def _find(self, instance):
-        for field in CustomFieldModel.get_for(instance):
-            if field.name == self._name or (self._code and self._code == field.code):
-                return field
-        return None
+        return custom_fields_registry.find(instance._path, name=self._name, code=self._code)
 
     def _check(self, instance):
         if self._field_id:
@@ -125,19 +176,20 @@ class BaseCustomField(fields._BaseField, metaclass=_FieldsRegisterMeta):
     def on_get_instance(self, instance, data):
         if data is None:
             return
-        field_data = self._get_raw_field(data)
+        field_data = self._get_raw_field(data, instance)
         if field_data:
             return self.on_get(field_data["values"])
 
-    def _get_raw_field(self, data):
+    def _get_raw_field(self, data, instance):
         if data is None:
             return None
-        for field in data:
-            if field.get("field_name", "error") == self._name:
-                return field
-            if self._code and field.get("field_code") == self._code:
-                return field
-        return None
+        index = _get_index(instance, data)
+        if self._field_id is not None and ("id", self._field_id) in index:
+            return index["id", self._field_id]
+        return index.get(("name", self._name)) or (index.get(("code", self._code)) if self._code else None)
+
+    def on_set_field(self, instance, field_data, value):
+        return self.on_set_instance(field_data["values"], value)
 
     def _create_raw_field(self):
         _data = {"field_id": self._field_id, "values": []}
@@ -153,20 +205,49 @@ class BaseCustomField(fields._BaseField, metaclass=_FieldsRegisterMeta):
         data = instance._data
         for _path in self._path:
             data = data.setdefault(_path, {self.name: []})
-        _data = self._get_raw_field(data.get(self.name))
+        _data = self._get_raw_field(data.get(self.name), instance)
         if _data is None:
             self._check(instance)
             if data.get(self.name) is None:
                 data[self.name] = []
-            data.setdefault(self.name, []).append(self._create_raw_field())
-            _data = self._get_raw_field(data.get(self.name))
-        values = self.on_set_instance(_data["values"], value)
+            _data = self._create_raw_field()
+            _add_to_index(instance, data[self.name], _data)
+        values = self.on_set_field(instance, _data, value)
 
         _data["values"] = values
         self._notify_instance(instance)
         return values
 
 
+def _index_field(index, field):
+    for key in ("id", "name", "code"):
+        value = field.get("field_" + key)
+        if value is not None:
+            index.setdefault((key, value), field)
+
+
+def _get_index(instance, values):
+    """
+    Index of custom_fields_values by field id, name and code built once per instance
+    and rebuilt only if the list was replaced or changed not through fields
+    """
+    cached = instance._custom_fields_index
+    if cached is not None and cached[0] is values and cached[1] == len(values):
+        return cached[2]
+    index = {}
+    for field in values:
+        _index_field(index, field)
+    instance._custom_fields_index = (values, len(values), index)
+    return index
+
+
+def _add_to_index(instance, values, field):
+    index = _get_index(instance, values)
+    values.append(field)
+    _index_field(index, field)
+    instance._custom_fields_index = (values, len(values), index)
+
+
 class TextCustomField(BaseCustomField):
     type = TEXT
 
@@ -204,6 +285,17 @@ class SelectCustomField(TextCustomField):
             return [{"value": value.value, "enum_id": value.id}]
         return [{"value": value}]
 
+    def on_set_field(self, instance, field_data, value):
+        values = super().on_set_field(instance, field_data, value)
+        if field_data.get("field_id") is None:
+            return values
+        # amocrm matches enums by id, values are resolved with the cached fields definitions
+        enums = custom_fields_registry.get_enums(instance._path, field_data["field_id"])
+        for item in values:
+            if item.get("enum_id") is None and item["value"] in enums:
+                item["enum_id"] = enums[item["value"]]
+        return values
+
 
 class RadioButtonCustomField(SelectCustomField):
     type = RADIOBUTTON
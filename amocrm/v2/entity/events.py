@@ -1,6 +1,8 @@
+import time
 from datetime import datetime
 
 from .. import fields, manager, model
+from ..filters import RangeFilter, SingleListFilter
 from ..interaction import GenericInteraction
 
 EVENT_TYPES_WITH_BLANK_VALUE = (
@@ -65,6 +67,8 @@ EVENT_TYPES_LINK_ENTITY = (
     "entity_unlinked",
 )
 EVENT_REQUEST_LIMIT = 100
+STREAM_MIN_INTERVAL = 1  # seconds between polls while there are new events
+STREAM_MAX_INTERVAL = 60  # the interval doubles up to it while there are no new events
 
 
 class _EventValueField(fields._UnEditableField):
@@ -115,10 +119,54 @@ class _EventValueField(fields._UnEditableField):
 
 class EventsInteraction(GenericInteraction):
     path = "events"
+    limit = EVENT_REQUEST_LIMIT
+
+
+class EventsManager(manager.Manager):
+    def stream(
+        self,
+        since=None,
+        types=None,
+        storage=None,
+        key="events",
+        min_interval=STREAM_MIN_INTERVAL,
+        max_interval=STREAM_MAX_INTERVAL,
+    ):
+        """
+        Endless iteration over new events in order of creation:
+
+            for event in Event.objects.stream(types=["lead_status_changed"], storage=FileStateStorage()):
+                ...
+
+        Only events created since the cursor (time of the last seen event) are requested, the interval between polls
+        grows while there are no new events. The cursor is saved to the storage (amocrm.v2.state) after every
+        poll's events are consumed, so the stream continues from there after restart
+        """
+        state = storage.get(key) if storage is not None else None
+        if state is None:
+            since = since if since is not None else datetime.now()
+            state = {"created_at": int(since.timestamp()) if isinstance(since, datetime) else int(since), "ids": []}
+        created_at, seen = state["created_at"], set(state["ids"])
+        type_filters = (SingleListFilter("type")(list(types)),) if types else ()
+        interval = min_interval
+        while True:
+            new = [
+                event
+                for event in self.filter(filters=(RangeFilter("created_at")(created_at, None), *type_filters))
+                if event._data["created_at"] > created_at
+                or (event._data["created_at"] == created_at and event.id not in seen)
+            ]
+            new.sort(key=lambda event: (event._data["created_at"], event.id))
+            for event in new:
+                if event._data["created_at"] > created_at:
+                    created_at, seen = event._data["created_at"], set()
+                seen.add(event.id)
+                yield event
+            if new and storage is not None:
+                storage.save(key, {"created_at": created_at, "ids": sorted(seen)})
+            interval = min_interval if new else min(interval * 2, max_interval)
+            time.sleep(interval)
 
-    def get_all(self, include=None, query=None, filters=(), order=None):
-        for data in self._all(self._get_path(), include=include, query=query, filters=filters, order=order, limit=EVENT_REQUEST_LIMIT):
-            yield from data[self._get_field()]
 
 class Event(model.Model):
     type = fields._Field("type")
@@ -130,4 +178,4 @@ class Event(model.Model):
     value_after = _EventValueField("value_after")
     value_before = _EventValueField("value_before")
 
-    objects = manager.Manager(EventsInteraction())
+    objects = EventsManager(EventsInteraction())
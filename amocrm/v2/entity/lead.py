@@ -1,7 +1,7 @@
 from .. import fields, manager, model
 from ..interaction import GenericInteraction
 from .note import NotesField
-from .pipeline import Status
+from .pipeline import Status, pipelines_registry
 from .tag import TagsField
 from .task import TaskField
 
@@ -13,13 +13,13 @@ class _StatusesField(fields._BaseField):
         super().__init__("status_id", blank=True)
 
     def on_get_instance(self, instance, status_id):
-        for status in instance.pipeline.statuses:
-            if status.id == status_id:
-                return status
+        if status_id is None:
+            return None
+        return pipelines_registry.get_status(instance._data.get("pipeline_id"), status_id)
 
     def on_set_instance(self, instance, value):
         if isinstance(value, str):
-            return Status.get_for(instance.pipeline).get(query=value).id
+            return pipelines_registry.find_status(instance._data.get("pipeline_id"), value).id
         if isinstance(value, Status):
             return value.id
         return value
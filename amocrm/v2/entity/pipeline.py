@@ -1,6 +1,10 @@
-from .. import fields, manager, model
+from .. import exceptions, fields, manager, model
+from ..cache import TTLCache
 from ..interaction import GenericInteraction
 
+DEFAULT_INDEX_TTL = 300  # seconds
+DEFAULT_MISS_RELOAD_INTERVAL = 60  # seconds
+
 
 class StatusesInteraction(GenericInteraction):
     path = "leads/pipelines/{pipeline_id}/statuses"
@@ -13,11 +17,10 @@ class StatusesInteraction(GenericInteraction):
     def _get_path(self):
         return self.path.format(pipeline_id=self._pipeline_id)
 
-    def get_all(self, include=None, query=None, filters=(), order=None):
-        for data in self._all(self._get_path(), include=include, query=None, filters=filters, order=order):
-            for status_data in data[self._get_field()]:
-                if not query or status_data["name"].lower() == query.lower():
-                    yield status_data
+    def get_all(self, include=None, query=None, **kwargs):
+        for status_data in super().get_all(include=include, **kwargs):
+            if not query or status_data["name"].lower() == query.lower():
+                yield status_data
 
 
 class Status(model.Model):
@@ -60,3 +63,56 @@ class Pipeline(model.Model):
     statuses = _StatusField()
 
     objects = manager.Manager(PipelinesInteraction())
+
+
+class _PipelinesIndex:
+    def __init__(self, pipelines):
+        self.pipelines = {}
+        self.statuses = {}  # (pipeline id, status id) -> Status
+        self.by_name = {}  # (pipeline id, lowercased status name) -> Status
+        for pipeline in pipelines:
+            self.pipelines[pipeline.id] = pipeline
+            for status in pipeline.statuses:
+                self.statuses[(pipeline.id, status.id)] = status
+                self.by_name.setdefault((pipeline.id, status.name.lower()), status)
+
+
+class PipelinesRegistry:
+    """
+    Pipelines with their statuses of the account requested once per ttl
+
+        pipelines_registry.get_status(pipeline_id, status_id)
+        pipelines_registry.find_status(pipeline_id, "Первичный контакт")
+        pipelines_registry.invalidate()  # after pipelines were changed in amocrm
+
+    A status that is not in the index may be added after it was loaded, so the index is reloaded,
+    but not more often than once per miss_reload_interval
+    """
+
+    def __init__(self, ttl=DEFAULT_INDEX_TTL, miss_reload_interval=DEFAULT_MISS_RELOAD_INTERVAL):
+        self._index = TTLCache(load=lambda _: _PipelinesIndex(list(Pipeline.objects.all())), ttl=ttl)
+        self._miss_reload_interval = miss_reload_interval
+
+    def _find(self, get):
+        value = get(self._index.get())
+        if value is None:
+            value = get(self._index.reload(min_interval=self._miss_reload_interval))
+        return value
+
+    def get_pipeline(self, pipeline_id):
+        return self._find(lambda index: index.pipelines.get(pipeline_id))
+
+    def get_status(self, pipeline_id, status_id):
+        return self._find(lambda index: index.statuses.get((pipeline_id, status_id)))
+
+    def find_status(self, pipeline_id, name):
+        status = self._find(lambda index: index.by_name.get((pipeline_id, name.lower())))
+        if status is None:
+            raise exceptions.NotFound("No status {} in pipeline {}".format(name, pipeline_id))
+        return status
+
+    def invalidate(self):
+        self._index.invalidate()
+
+
+pipelines_registry = PipelinesRegistry()
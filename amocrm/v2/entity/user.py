@@ -5,11 +5,10 @@ from ..interaction import GenericInteraction
 class UsersInteraction(GenericInteraction):
     path = "users"
 
-    def get_all(self, include=None, query=None, filters=(), order=None):
-        for data in self._all(self._get_path()):
-            for item in data[self._get_field()]:
-                if query is None or query in item.values():
-                    yield item
+    def get_all(self, include=None, query=None, **kwargs):
+        for item in super().get_all(include=include, **kwargs):
+            if query is None or query in item.values():
+                yield item
 
 
 class User(model.Model):
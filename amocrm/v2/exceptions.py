@@ -22,6 +22,12 @@ class PermissionsDenyException(AmoApiException):
     """
 
 
+class TooManyRequests(AmoApiException):
+    """
+    Rate limit exceeded and retries didn't help
+    """
+
+
 class NotFound(AmoApiException):
     """
     Amocrm api return 404 or nothing
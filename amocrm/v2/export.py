@@ -0,0 +1,275 @@
+import csv
+import json
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from . import fields
+from .entity.custom_field import custom_fields_registry
+from .filters import RangeFilter
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+DEFAULT_PARTITIONS = 16
+DEFAULT_WORKERS = 4
+DEFAULT_COLUMNS_BATCH_SIZE = 10000
+PARTITION_BUFFER_SIZE = 1000  # entities of a partition that are crawled ahead
+
+_DONE = object()
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if isinstance(value, datetime) else int(value)
+
+
+def _get_bounds(start, end, partitions):
+    partitions = max(1, min(partitions, end - start))
+    edges = [start + (end - start) * i // partitions for i in range(partitions + 1)]
+    return list(zip(edges, edges[1:]))
+
+
+def _put(items, item, stop):
+    """
+    Put to the bounded partition queue unless the export is stopped
+    """
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def partitioned_export(
+    model,
+    start,
+    end,
+    field="created_at",
+    partitions=DEFAULT_PARTITIONS,
+    workers=DEFAULT_WORKERS,
+    filters=(),
+    records=False,
+):
+    """
+    Export entities with `field` (created_at, updated_at or id) between start and end, both included.
+    The range is split into partitions, which are crawled concurrently, so deep pagination is avoided:
+
+        for lead in partitioned_export(Lead, datetime(2020, 1, 1), datetime.now(), workers=4):
+            ...
+
+    Entities are yielded in partitions order, every partition is ordered by id.
+    amoCRM includes both range ends, so entities from the boundaries are kept only in one partition.
+    Up to 2 * workers partitions are crawled ahead, each keeps at most PARTITION_BUFFER_SIZE entities in memory.
+    Crawling stops when the generator is closed
+    """
+    start, end = _timestamp(start), _timestamp(end)
+    manager = model.objects
+    model = model._get_record_class() if records else model
+    include = manager._model._get_embedded_fields()
+    stop = threading.Event()
+
+    def fetch(value_from, value_to, items):
+        last = value_to == end
+        try:
+            for data in manager._interaction.get_all(
+                include=include, filters=(*filters, RangeFilter(field)(value_from, value_to)), order={"id": "asc"}
+            ):
+                if value_from <= data[field] < value_to or (last and data[field] == value_to):
+                    if not _put(items, model(data=data), stop):
+                        return
+        except Exception as e:  # pylint: disable=broad-except
+            _put(items, e, stop)
+            return
+        _put(items, _DONE, stop)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(partition):
+        items = queue.Queue(maxsize=PARTITION_BUFFER_SIZE)
+        return items, executor.submit(fetch, *partition, items)
+
+    bounds = iter(_get_bounds(start, end, partitions))
+    pending = deque(submit(partition) for _, partition in zip(range(2 * workers), bounds))
+    try:
+        while pending:
+            item = pending[0][0].get()
+            if item is _DONE:
+                pending.popleft()
+                for partition in bounds:
+                    pending.append(submit(partition))
+                    break
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        for _, future in pending:
+            future.cancel()
+        # running crawls stop at the next entity, so only requests in flight are waited for
+        executor.shutdown()
+
+
+def _get_columns(model):
+    """
+    Columns of plain fields named as in the api: (name, path, key), embedded entities and custom fields are skipped
+    """
+    columns = {}
+    for field in model._fields.values():
+        if field.name is None or field.is_embedded or field.is_custom:
+            continue
+        columns.setdefault(".".join((*field._path, field.name)), (field._path, field.name))
+    return [(name, path, key) for name, (path, key) in columns.items()]
+
+
+def _get_integer_columns(model):
+    """
+    Columns that are integers in the api whatever values the first rows have: ids, links and timestamps
+    """
+    return {
+        ".".join((*field._path, field.name))
+        for field in model._fields.values()
+        if field.name is not None
+        and not field.is_embedded
+        and not field.is_custom
+        and (
+            isinstance(field, (fields._DateTimeField, fields._Link)) or field.name == "id" or field.name.endswith("_id")
+        )
+    }
+
+
+def _get_value(data, path, key):
+    for _path in path:
+        data = data.get(_path) or {}
+    value = data.get(key) if isinstance(data, dict) else None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _get_custom_values(data, enums):
+    result = {}
+    for field in data.get("custom_fields_values") or ():
+        field_enums = enums.get(field["field_id"], {})
+        values = [
+            value.get("value") if value.get("value") is not None else field_enums.get(value.get("enum_id"))
+            for value in field.get("values") or ()
+        ]
+        result[field["field_id"]] = "; ".join(str(value) for value in values if value is not None) or None
+    return result
+
+
+class _CsvWriter:
+    def __init__(self, output, names):
+        self._file = open(output, "w", newline="", encoding="utf-8") if isinstance(output, str) else None
+        self._writer = csv.writer(self._file or output)
+        self._writer.writerow(names)
+
+    def write(self, columns):
+        self._writer.writerows(zip(*columns.values()))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class _ArrowWriter:
+    def __init__(self, output, names, format, integers=()):
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to export to {} (pip install pyarrow)".format(format))
+        self._output = output
+        self._format = format
+        self._integers = set(integers)
+        self._schema = None
+        self._writer = None
+
+    def _get_schema(self, columns):
+        """
+        Ids and timestamps are int64 and custom fields are strings always, the rest types are taken from the first
+        batch: numbers are float64 (price could be int and float), columns without values there are strings
+        """
+        schema = []
+        for field in pyarrow.table(columns).schema:
+            if field.name in self._integers:
+                field = field.with_type(pyarrow.int64())
+            elif field.name.startswith("cf_") or pyarrow.types.is_null(field.type):
+                field = field.with_type(pyarrow.string())
+            elif pyarrow.types.is_integer(field.type):
+                field = field.with_type(pyarrow.float64())
+            schema.append(field)
+        return pyarrow.schema(schema)
+
+    @staticmethod
+    def _get_array(values, field):
+        try:
+            return pyarrow.array(values, type=field.type)
+        except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+            if not pyarrow.types.is_string(field.type):
+                raise
+            # the column had no values in the first batch
+            return pyarrow.array([value if value is None else str(value) for value in values], type=field.type)
+
+    def write(self, columns):
+        if self._schema is None:
+            self._schema = self._get_schema(columns)
+            if self._format == "parquet":
+                self._writer = pyarrow.parquet.ParquetWriter(self._output, self._schema)
+            else:
+                self._writer = pyarrow.ipc.new_file(self._output, self._schema)
+        arrays = [self._get_array(columns[field.name], field) for field in self._schema]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def export_columns(model, output, format=None, batch_size=DEFAULT_COLUMNS_BATCH_SIZE, custom_fields=True, **kwargs):
+    """
+    Write entities as a table straight from the api pages, without creating model instances:
+
+        export_columns(Lead, "leads.parquet", filters=(...))  # csv, parquet or arrow (pip install pyarrow)
+
+    There is a column for every plain field of the model (raw api values, dates as timestamps) and a column cf_<id>
+    for every custom field of the entity type, where enums are resolved to values and multiple values are joined.
+    In parquet and arrow ids and timestamps are int64 and custom fields are strings, even when a batch has no values.
+    Only batch_size rows are kept in memory. Returns the number of exported rows
+    """
+    if format is None:
+        format = output.rsplit(".", 1)[-1] if isinstance(output, str) and "." in output else "csv"
+    interaction = model.objects._interaction
+    columns = _get_columns(model)
+    custom = custom_fields_registry.get_fields(interaction.path) if custom_fields else []
+    enums = {field.id: {enum["id"]: enum["value"] for enum in field.enums or ()} for field in custom}
+    names = [name for name, _, _ in columns] + ["cf_{}".format(field.id) for field in custom]
+    if format == "csv":
+        writer = _CsvWriter(output, names)
+    else:
+        writer = _ArrowWriter(output, names, format, integers=_get_integer_columns(model))
+
+    rows = 0
+    batch = {name: [] for name in names}
+    try:
+        for data in interaction.get_all(**kwargs):
+            for name, path, key in columns:
+                batch[name].append(_get_value(data, path, key))
+            values = _get_custom_values(data, enums)
+            for field in custom:
+                batch["cf_{}".format(field.id)].append(values.get(field.id))
+            rows += 1
+            if rows % batch_size == 0:
+                writer.write(batch)
+                batch = {name: [] for name in names}
+        if rows % batch_size or not rows:
+            writer.write(batch)
+    finally:
+        writer.close()
+    return rows
@@ -1,12 +1,14 @@
 from datetime import datetime
 
 from . import exceptions
+from .identity_map import get_object, get_objects
 from .links import LinksInteraction
 from .register import get_model_by_name
 
 
 class _BaseField:
     _path = []
+    is_custom = False
 
     def __init__(self, name=None, blank=False, path=None, is_embedded=None):
         self.name = name
@@ -24,16 +26,18 @@ class _BaseField:
     def __get__(self, instance, _=None):
         if instance is None:
             return self
+        data = self._get_raw(instance)
+        if data is None and not self._blank:
+            raise exceptions.NoDataException(str(self))
+        return self.on_get_instance(instance, data)
+
+    def _get_raw(self, instance):
         data = instance._data
         for _path in self._path:
             data = data.get(_path, {})
         if isinstance(data, dict):
-            data = data.get(self.name)
-        else:
-            data = None
-        if data is None and not self._blank:
-            raise exceptions.NoDataException(str(self))
-        return self.on_get_instance(instance, data)
+            return data.get(self.name)
+        return None
 
     def __set__(self, instance, value):
         if instance is None or value is None:
@@ -117,31 +121,55 @@ class _Link(_BaseField):
     def _manager(self):
         return self.__manager or self._model.objects if self._model else None
 
+    def on_get_instance(self, instance, data):
+        if self.name in instance._prefetched:
+            return instance._prefetched[self.name]
+        return self.on_get(data)
+
+    def on_set_instance(self, instance, value):
+        instance._prefetched.pop(self.name, None)
+        return super().on_set_instance(instance, value)
+
     def on_get(self, data):
-        return self._manager.get(object_id=data)
+        return get_object(self._manager, data)
 
     def on_set(self, value):
         if isinstance(value, self._model):
             return value.id
         return value
 
+    def get_linked_ids(self, instance):
+        data = self._get_raw(instance)
+        return [] if data is None else [data]
+
+    def set_prefetched(self, instance, linked):
+        instance._prefetched[self.name] = linked[0] if linked else None
+
 
 class _ListData:
-    def __init__(self, data, instance, model, manager=None, links=LinksInteraction()):
+    def __init__(self, data, instance, model, manager=None, links=LinksInteraction(), prefetched=None):
         self._data = data
         self._model = model
         self._instance = instance
         self._manager = manager or model.objects if model else None
         self._links = links
+        self._prefetched = prefetched
 
     def __iter__(self):
-        yield from (self._manager.get(item["id"]) for item in self._data)
+        if self._prefetched is not None:
+            yield from self._prefetched
+            return
+        if self._data:
+            yield from get_objects(self._manager, [item["id"] for item in self._data])
 
     def append(self, value, main=False):
         return self._links.link(for_entity=self._instance, to_entity=value, main=main)
 
     add = append
 
+    def extend(self, values, main=False):
+        return self._links.link_many([(self._instance, value) for value in values], main=main)
+
     def remove(self, value):
         return self._links.unlink(for_entity=self._instance, to_entity=value)
 
@@ -153,15 +181,19 @@ class _EmbeddedLinkField(_Link):
 
     def on_get(self, data):
         if data:
-            return self._model.objects.get(data[0]["id"])
+            return get_object(self._manager, data[0]["id"])
         return None
 
+    def get_linked_ids(self, instance):
+        return [item["id"] for item in self._get_raw(instance) or []][:1]
+
     def on_set_instance(self, instance, value):
         if instance.id is None:
             raise exceptions.InitException("Create entity first")
         if value.id is None:
             value.create()
         self._links.link(instance, value)
+        instance._prefetched.pop(self.name, None)
         return [{"id": value.id}]
 
 
@@ -171,7 +203,20 @@ class _EmbeddedLinkListField(_Link):
     ]
 
     def on_get_instance(self, instance, value):
-        return _ListData(data=value, model=self._model, manager=self._manager, instance=instance, links=self._links)
+        return _ListData(
+            data=value,
+            model=self._model,
+            manager=self._manager,
+            instance=instance,
+            links=self._links,
+            prefetched=instance._prefetched.get(self.name),
+        )
 
     def on_set(self, value):
         raise TypeError()
+
+    def get_linked_ids(self, instance):
+        return [item["id"] for item in self._get_raw(instance) or []]
+
+    def set_prefetched(self, instance, linked):
+        instance._prefetched[self.name] = linked
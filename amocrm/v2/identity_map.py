@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+DEFAULT_MAXSIZE = 10000
+
+# (identity map, value of the outer scope) - every context (thread, task) keeps its own chain of scopes
+_current = ContextVar("amocrm_identity_map", default=None)
+
+
+class IdentityMap:
+    """
+    Scope where linked entities (lead.responsible_user, contact.leads, ...) are requested only once:
+
+        with IdentityMap(ttl=60):
+            for lead in Lead.objects.all():
+                print(lead.responsible_user.name)  # every user is requested once
+
+    Least recently used entities are evicted when maxsize is reached
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        _current.set((self, _current.get()))
+        return self
+
+    def __exit__(self, *exc_info):
+        identity_map, outer = _current.get()
+        assert identity_map is self, "Identity map scopes exited in wrong order"
+        _current.set(outer)
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            instance, expire_at = item
+            if expire_at is not None and expire_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return instance
+
+    def set(self, key, instance):
+        expire_at = time.monotonic() + self._ttl if self._ttl is not None else None
+        with self._lock:
+            self._items[key] = (instance, expire_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+def get_current_identity_map():
+    current = _current.get()
+    return current[0] if current else None
+
+
+def _get_key(manager, object_id):
+    return manager._model, manager._interaction.path, object_id
+
+
+def get_object(manager, object_id):
+    """
+    Get instance by id from the current identity map or request it with manager
+    """
+    identity_map = get_current_identity_map()
+    if identity_map is None:
+        return manager.get(object_id=object_id)
+    key = _get_key(manager, object_id)
+    instance = identity_map.get(key)
+    if instance is None:
+        instance = manager.get(object_id=object_id)
+        identity_map.set(key, instance)
+    return instance
+
+
+def get_objects(manager, object_ids):
+    """
+    Get instances by ids from the current identity map and request missing ones with one request per batch
+    """
+    identity_map = get_current_identity_map()
+    if identity_map is None:
+        return manager.get_many(object_ids)
+    found = {object_id: identity_map.get(_get_key(manager, object_id)) for object_id in object_ids}
+    for instance in manager.get_many([object_id for object_id, instance in found.items() if instance is None]):
+        identity_map.set(_get_key(manager, instance.id), instance)
+        found[instance.id] = instance
+    return [found[object_id] for object_id in object_ids if found.get(object_id) is not None]
@@ -1,23 +1,58 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple
 
 import requests
 
 from . import exceptions
+from .cache import default_response_cache
+from .codec import default_codec
 from .filters import Filter
+from .json_stream import iter_embedded
+from .rate_limit import default_rate_limiter
 from .tokens import default_token_manager
 
 _session = requests.Session()
 
+MAX_BATCH_SIZE = 250
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds, doubles on each retry
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def chunks(items, size=MAX_BATCH_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
 
 class BaseInteraction:
     _default_headers = {
         "User-Agent": "amocrm-py/v2",
     }
 
-    def __init__(self, token_manager=default_token_manager, session=_session, headers=_default_headers):
+    def __init__(
+        self,
+        token_manager=default_token_manager,
+        session=_session,
+        headers=_default_headers,
+        rate_limiter=default_rate_limiter,
+        retries=DEFAULT_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        codec=default_codec,
+        cache=default_response_cache,
+        base_url=None,
+    ):
         self._token_manager = token_manager
         self._session = session
         self._default_headers = headers
+        self._rate_limiter = rate_limiter
+        self._retries = retries
+        self._backoff = backoff
+        self._codec = codec
+        self._cache = cache
+        self._base_url = base_url
 
     def get_headers(self):
         headers = {}
@@ -29,36 +64,125 @@ class BaseInteraction:
         return {"Authorization": "Bearer " + self._token_manager.get_access_token()}
 
     def _get_url(self, path):
-        return "https://{subdomain}.amocrm.ru/api/v4/{path}".format(subdomain=self._token_manager.subdomain, path=path)
+        return "{base_url}/api/v4/{path}".format(base_url=self._base_url or self._token_manager.base_url, path=path)
 
-    def _request(self, method, path, data=None, params=None, headers=None):
+    def _send(self, method, path, data=None, params=None, headers=None, stream=False):
         headers = headers or {}
         headers.update(self.get_headers())
-        try:
-            response = self._session.request(method, url=self._get_url(path), json=data, params=params, headers=headers)
-        except requests.exceptions.ConnectionError as e:
-            raise exceptions.AmoApiException(e.args[0].args[0])  # Sometimes Connection aborted.
-        if response.status_code == 204:
+        if data is not None:
+            data = self._codec.dumps(data)
+            headers["Content-Type"] = self._codec.content_type
+        attempt, auth_retried = 0, False
+        while True:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(self._token_manager.subdomain)
+            try:
+                response = self._session.request(
+                    method, url=self._get_url(path), data=data, params=params, headers=headers, stream=stream
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt >= self._retries or method.lower() == "post":
+                    raise exceptions.AmoApiException(str(e))  # Sometimes Connection aborted.
+                time.sleep(self._get_retry_delay(attempt))
+                attempt += 1
+                continue
+            if response.status_code == 401 and not auth_retried:
+                # cached token may be rotated by another process - retry once with the token from the storage
+                response.close()
+                self._token_manager.reset_cache()
+                headers.update(self._get_auth_headers())
+                auth_retried = True
+                continue
+            if attempt >= self._retries or not self._is_retryable(method, response.status_code):
+                return response
+            response.close()
+            time.sleep(self._get_retry_delay(attempt, response.headers.get("Retry-After")))
+            attempt += 1
+
+    def _request(self, method, path, data=None, params=None, headers=None):
+        if self._cache is not None and self._cache.get_ttl(path) is not None:
+            return self._cached_request(method, path, data=data, params=params, headers=headers)
+        response = self._send(method, path, data=data, params=params, headers=headers)
+        return self._decode_response(response.status_code, response.content, response.text)
+
+    def _decode_response(self, status_code, content, text=None):
+        if status_code == 204:
             return None, 204
-        if response.status_code < 300 or response.status_code == 400:
-            return response.json(), response.status_code
-        if response.status_code == 401:
+        if status_code < 300 or status_code == 400:
+            return self._codec.loads(content), status_code
+        self._raise_for_status(status_code, text)
+
+    def _cached_request(self, method, path, data=None, params=None, headers=None):
+        account = self._token_manager.subdomain
+        if method.lower() != "get":
+            self._cache.invalidate(account, path)
+            response = self._send(method, path, data=data, params=params, headers=headers)
+            return self._decode_response(response.status_code, response.content, response.text)
+        ttl = self._cache.get_ttl(path)
+        key = self._cache.get_key(account, path, params)
+        cached = self._cache.get(key)
+        if cached is not None:
+            status_code, content, etag, is_fresh = cached
+            if is_fresh:
+                return self._decode_response(status_code, content)
+            if etag:
+                headers = {**(headers or {}), "If-None-Match": etag}
+        response = self._send(method, path, data=data, params=params, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self._cache.touch(key, ttl)
+            return self._decode_response(cached[0], cached[1])
+        if response.status_code in (200, 204):
+            self._cache.set(
+                key,
+                "{}:{}".format(account, path),
+                response.status_code,
+                response.content,
+                response.headers.get("ETag"),
+                ttl,
+            )
+        return self._decode_response(response.status_code, response.content, response.text)
+
+    @staticmethod
+    def _is_retryable(method, status_code):
+        if status_code == 429:
+            return True
+        # server errors are retried only for requests that can't create duplicates
+        return status_code >= 500 and method.lower() != "post"
+
+    def _get_retry_delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self._backoff * 2**attempt
+
+    @staticmethod
+    def _raise_for_status(status_code, text):
+        if status_code == 429:
+            raise exceptions.TooManyRequests()
+        if status_code == 401:
             raise exceptions.UnAuthorizedException()
-        if response.status_code == 403:
+        if status_code == 403:
             raise exceptions.PermissionsDenyException()
-        if response.status_code == 402:
+        if status_code == 402:
             raise ValueError("Тариф не позволяет включать покупателей")
-        raise exceptions.AmoApiException("Wrong status {} ({})".format(response.status_code, response.text))
+        raise exceptions.AmoApiException("Wrong status {} ({})".format(status_code, text))
 
     def request(self, method, path, data=None, params=None, headers=None, include=None):
+        return self._request(method, path, data=data, params=self._get_params(params, include), headers=headers)
+
+    @staticmethod
+    def _get_params(params=None, include=None):
         params = params or {}
         if include:
             params["with"] = ",".join(include)
-        return self._request(method, path, data=data, params=params, headers=headers)
+        return params
 
-    def _list(self, path, page, include=None, limit=250, query=None, filters: Tuple[Filter] = (), order=None):
+    @staticmethod
+    def _get_list_params(page, limit=250, query=None, filters: Tuple[Filter] = (), order=None):
         assert order is None or len(order) == 1
-        assert limit <= 250
+        assert limit <= MAX_BATCH_SIZE
         params = {
             "page": page,
             "limit": limit,
@@ -67,11 +191,24 @@ class BaseInteraction:
         if order:
             field, value = list(order.items())[0]
             params["order[{}]".format(field)] = value
-        for _filter in filters:
+        for _filter in filters or ():
             params.update(_filter._as_params())
+        return params
+
+    def _list(self, path, page, include=None, limit=250, query=None, filters: Tuple[Filter] = (), order=None):
+        params = self._get_list_params(page, limit=limit, query=query, filters=filters, order=order)
         return self.request("get", path, params=params, include=include)
 
-    def _all(self, path, include=None, query=None, filters: Tuple[Filter] = (), order=None, limit=250):
+    @staticmethod
+    def _has_next(response):
+        return "next" in response.get("_links", [])
+
+    def _all(self, path, include=None, query=None, filters: Tuple[Filter] = (), order=None, limit=250, prefetch=0):
+        if prefetch:
+            yield from self._all_prefetched(
+                path, prefetch, include=include, query=query, filters=filters, order=order, limit=limit
+            )
+            return
         page = 1
         while True:
             response, _ = self._list(
@@ -80,14 +217,87 @@ class BaseInteraction:
             if response is None:
                 return
             yield response["_embedded"]
-            if "next" not in response.get("_links", []):
+            if not self._has_next(response):
                 return
             page += 1
 
+    def _all_streamed(self, path, field, include=None, query=None, filters: Tuple[Filter] = (), order=None, limit=250):
+        """
+        Same as _all but items of `_embedded.<field>` are yielded one by one while the page is being received,
+        so a page is never materialized as a whole
+        """
+        page = 1
+        while True:
+            params = self._get_list_params(page, limit=limit, query=query, filters=filters, order=order)
+            response = self._send("get", path, params=self._get_params(params, include), stream=True)
+            with response:
+                if response.status_code == 204:
+                    return
+                if response.status_code >= 300:
+                    self._raise_for_status(response.status_code, response.text)
+                rest = yield from iter_embedded(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), field)
+            if not self._has_next(rest):
+                return
+            page += 1
+
+    def _all_from_cursor(self, cursor, path, field, include=None, query=None, filters=(), order=None, limit=250):
+        """
+        Same as _all, but yields items and keeps the position in the cursor.
+        A resumed page skips items up to the last yielded one, if it is still there
+        """
+        if cursor.path is None:
+            params = self._get_list_params(1, limit=limit, query=query, filters=filters, order=order)
+            params.pop("page")
+            cursor.path, cursor.params = path, self._get_params(params, include)
+        while not cursor.finished:
+            response, _ = self._request("get", cursor.path, params={**cursor.params, "page": cursor.page})
+            if response is None:
+                cursor.finished = True
+                return
+            items = response["_embedded"][field]
+            ids = [item.get("id") for item in items]
+            if cursor.last_id is not None and cursor.last_id in ids:
+                items = items[ids.index(cursor.last_id) + 1 :]
+            for item in items:
+                cursor.last_id = item.get("id")
+                yield item
+            if not self._has_next(response):
+                cursor.finished = True
+                return
+            cursor.page += 1
+
+    def _all_prefetched(self, path, prefetch, **kwargs):
+        """
+        Same as _all but up to `prefetch` pages are requested concurrently while the caller processes the current one.
+        The api doesn't tell how many pages are there, so pages after the last one could be requested
+        (at most prefetch - 1 requests, they are answered with 204)
+        """
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        pending = deque(executor.submit(self._list, path, page, **kwargs) for page in range(1, prefetch + 1))
+        page = prefetch
+        try:
+            while True:
+                response, _ = pending.popleft().result()
+                if response is None:
+                    return
+                finished = not self._has_next(response)
+                if not finished:
+                    page += 1
+                    pending.append(executor.submit(self._list, path, page, **kwargs))
+                yield response["_embedded"]
+                if finished:
+                    return
+        finally:
+            # when iteration is stopped early only requests already sent are waited for
+            for future in pending:
+                future.cancel()
+            executor.shutdown()
+
 
 class GenericInteraction(BaseInteraction):
     path = ""
     field = None
+    limit = MAX_BATCH_SIZE  # page size for get_all
 
     def __init__(self, *args, path=None, field=None, **kwargs):
         super().__init__(*args, **kwargs)
@@ -108,8 +318,41 @@ class GenericInteraction(BaseInteraction):
         )
         return response["_embedded"][self._get_field()]
 
-    def get_all(self, include=None, query=None, filters=(), order=None):
-        for data in self._all(self._get_path(), include=include, query=query, filters=filters, order=order):
+    def get_all(self, include=None, query=None, filters=(), order=None, prefetch=0, stream=False, cursor=None):
+        if cursor is not None:
+            assert not prefetch and not stream, "Iteration with cursor can't be prefetched or streamed"
+            yield from self._all_from_cursor(
+                cursor,
+                self._get_path(),
+                self._get_field(),
+                include=include,
+                query=query,
+                filters=filters,
+                order=order,
+                limit=self.limit,
+            )
+            return
+        if stream:
+            assert not prefetch, "Streamed pages can't be prefetched"
+            yield from self._all_streamed(
+                self._get_path(),
+                self._get_field(),
+                include=include,
+                query=query,
+                filters=filters,
+                order=order,
+                limit=self.limit,
+            )
+            return
+        for data in self._all(
+            self._get_path(),
+            include=include,
+            query=query,
+            filters=filters,
+            order=order,
+            limit=self.limit,
+            prefetch=prefetch,
+        ):
             yield from data[self._get_field()]
 
     def get(self, object_id, include=None):
@@ -131,3 +374,17 @@ class GenericInteraction(BaseInteraction):
         if status == 400:
             raise exceptions.ValidationError(response)
         return response
+
+    def create_many(self, data):
+        assert len(data) <= MAX_BATCH_SIZE
+        response, status = self.request("post", self._get_path(), data=data)
+        if status == 400:
+            raise exceptions.ValidationError(response)
+        return response["_embedded"][self._get_field()]
+
+    def update_many(self, data):
+        assert len(data) <= MAX_BATCH_SIZE
+        response, status = self.request("patch", self._get_path(), data=data)
+        if status == 400:
+            raise exceptions.ValidationError(response)
+        return response["_embedded"][self._get_field()]
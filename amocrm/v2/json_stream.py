@@ -0,0 +1,115 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """
+    Pull parser over chunks of utf-8 json, values are decoded with the stdlib decoder as soon as they are complete
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._eof = True
+        tail = self._text_decoder.decode(b"", final=True)
+        self._buffer += tail
+        return bool(tail)
+
+    def peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of json")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError("Expected {!r} at {}".format(char, self._pos))
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def members(self):
+        """
+        Iterate over keys of an object, the caller has to read the value of every key
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == "}":
+                self._pos += 1
+                return
+            self.expect(",")
+
+    def elements(self):
+        """
+        Iterate over an array, the caller has to read every element
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            self.expect(",")
+
+
+def iter_embedded(chunks, field):
+    """
+    Yield items of `_embedded.<field>` of a list response one by one while it is being received.
+    The rest of the response (_links, _page, ...) is returned as the generator result
+    """
+    reader = _Reader(chunks)
+    result = {}
+    for key in reader.members():
+        if key != "_embedded":
+            result[key] = reader.value()
+            continue
+        embedded = result["_embedded"] = {}
+        for name in reader.members():
+            if name != field:
+                embedded[name] = reader.value()
+                continue
+            for _ in reader.elements():
+                yield reader.value()
+    return result
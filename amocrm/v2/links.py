@@ -1,5 +1,5 @@
 from . import exceptions
-from .interaction import BaseInteraction
+from .interaction import MAX_BATCH_SIZE, BaseInteraction, chunks
 
 
 class LinksInteraction(BaseInteraction):
@@ -9,13 +9,37 @@ class LinksInteraction(BaseInteraction):
     def unlink(self, for_entity, to_entity):
         return self._set("unlink", for_entity, to_entity)
 
+    def link_many(self, links, main=False, metadata=None, batch_size=MAX_BATCH_SIZE):
+        """
+        Link many pairs of entities with one request per entity type and batch:
+
+            links.link_many([(lead, contact) for lead in leads])
+        """
+        return self._set_many("link", links, main=main, metadata=metadata, batch_size=batch_size)
+
+    def unlink_many(self, links, batch_size=MAX_BATCH_SIZE):
+        return self._set_many("unlink", links, batch_size=batch_size)
+
     def _set(self, direction, for_entity, to_entity, main=False, metadata=None):
         path = "{}/{}/{}".format(for_entity._path, for_entity.id, direction)
-        data = {"to_entity_id": to_entity.id, "to_entity_type": to_entity._path}
-        if main:
-            metadata = metadata or {}
-            metadata["is_main"] = True
-        data["metadata"] = metadata
-        response, status = self.request("post", path, data=[data])
+        self._post(path, [_get_link_data(to_entity, main=main, metadata=metadata)])
+
+    def _set_many(self, direction, links, main=False, metadata=None, batch_size=MAX_BATCH_SIZE):
+        by_type = {}
+        for for_entity, to_entity in links:
+            data = {"entity_id": for_entity.id, **_get_link_data(to_entity, main=main, metadata=metadata)}
+            by_type.setdefault(for_entity._path, []).append(data)
+        for entity_type, data in by_type.items():
+            for batch in chunks(data, batch_size):
+                self._post("{}/{}".format(entity_type, direction), batch)
+
+    def _post(self, path, data):
+        response, status = self.request("post", path, data=data)
         if status == 400:
             raise exceptions.ValidationError(response)
+
+
+def _get_link_data(to_entity, main=False, metadata=None):
+    if main:
+        metadata = {**(metadata or {}), "is_main": True}
+    return {"to_entity_id": to_entity.id, "to_entity_type": to_entity._path, "metadata": metadata}
@@ -1,3 +1,8 @@
+from . import exceptions, fields, identity_map
+from .filters import SingleListFilter
+from .interaction import MAX_BATCH_SIZE, chunks
+
+
 class Manager:
     def __init__(self, interaction, model=None):
         self._interaction = interaction
@@ -18,14 +23,89 @@ class Manager:
     def update(self, object_id, data=None, **kwargs):
         return self._interaction.update(object_id=object_id, data=data or kwargs)
 
+    def bulk_create(self, models, batch_size=MAX_BATCH_SIZE):
+        models = list(models)
+        for batch in chunks(models, batch_size):
+            _set_created_ids(batch, self._interaction.create_many(_get_create_data(batch)))
+        return models
+
+    def bulk_update(self, models, batch_size=MAX_BATCH_SIZE):
+        models = [instance for instance in models if instance._updated_fields]
+        for batch in chunks(models, batch_size):
+            self._interaction.update_many([{"id": instance.id, **instance._get_updated_data()} for instance in batch])
+            for instance in batch:
+                instance._updated_fields = set()
+        return models
+
     def get(self, object_id=None, query=None):
         if object_id is not None:
             return self._model(data=self._interaction.get(object_id, include=self._model._get_embedded_fields()))
         return next(self.filter(query=query))
 
-    def filter(self, *args, **kwargs):
+    def get_many(self, object_ids, batch_size=MAX_BATCH_SIZE):
+        """
+        Get instances by ids with one request per batch_size ids (filter[id][]=...)
+        The result is ordered as ids, not found ids are skipped
+        """
+        found = {}
+        for batch in chunks(dict.fromkeys(object_ids), batch_size):
+            for instance in self.filter(filters=(SingleListFilter("id")(batch),)):
+                found[instance.id] = instance
+        return [found[object_id] for object_id in object_ids if object_id in found]
+
+    def prefetch_related(self, models, *names):
+        """
+        Resolve links of all given instances with a few batch requests:
+
+            leads = list(Lead.objects.filter(query="test"))
+            Lead.objects.prefetch_related(leads, "contacts", "responsible_user")
+            for lead in leads:
+                print(lead.responsible_user.name, [contact.name for contact in lead.contacts])  # no requests
+        """
+        models = list(models)
+        for name in names:
+            field = self._get_link_field(name)
+            ids = {id(instance): field.get_linked_ids(instance) for instance in models}
+            unique_ids = list(dict.fromkeys(_id for _ids in ids.values() for _id in _ids))
+            linked = {instance.id: instance for instance in identity_map.get_objects(field._manager, unique_ids)}
+            for instance in models:
+                field.set_prefetched(instance, [linked[_id] for _id in ids[id(instance)] if _id in linked])
+        return models
+
+    def _get_link_field(self, name):
+        field = self._model._fields.get(name)
+        if field is None:
+            raise AttributeError("{} has no field {}".format(self._model.__name__, name))
+        if not isinstance(field, fields._Link):
+            raise TypeError("{}.{} is not a link to other entities".format(self._model.__name__, name))
+        return field
+
+    def filter(self, *args, records=False, **kwargs):
+        """
+        Iterate over entities, with records=True yields compact read-only records instead of models
+        (pages are streamed then, unless prefetched or iterated with cursor)
+        """
+        model = self._model._get_record_class() if records else self._model
+        if records and not kwargs.get("prefetch") and kwargs.get("cursor") is None:
+            kwargs.setdefault("stream", True)
         for data in self._interaction.get_all(*args, include=self._model._get_embedded_fields(), **kwargs):
-            yield self._model(data=data)
+            yield model(data=data)
 
     def all(self):
         return self.filter()
+
+
+def _get_create_data(batch):
+    return [{**instance._data, "request_id": str(i)} for i, instance in enumerate(batch)]
+
+
+def _set_created_ids(batch, created):
+    """
+    Map ids of created entities back to instances by request_id echoed by amocrm
+    """
+    created = {str(data.get("request_id")): data["id"] for data in created}
+    for i, instance in enumerate(batch):
+        if str(i) not in created:
+            raise exceptions.AmoApiException("Entity with request_id {} was not created: no id in response".format(i))
+        instance._data["id"] = created[str(i)]
+        instance._updated_fields = set()
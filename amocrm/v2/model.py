@@ -1,11 +1,7 @@
-import inspect
-
 from . import fields
+from .codec import default_codec
 from .register import _RegisterMeta
 
-_EMBEDDED_FIELDS = (fields._EmbeddedLinkListField, fields._EmbeddedLinkField)
-_FIELDS_FOR_REPR = (fields._Field,) + _EMBEDDED_FIELDS
-
 
 class Model(metaclass=_RegisterMeta):
     _init_data = {}
@@ -15,10 +11,12 @@ class Model(metaclass=_RegisterMeta):
         self._data = data or {}
         self._data.update(self._init_data)
         self._updated_fields = set()
+        self._prefetched = {}
+        self._custom_fields_index = None
         attribs = kwargs.copy()
 
         for attr, value in attribs.items():
-            if isinstance(getattr(self.__class__, attr), fields._BaseField):
+            if attr in self._fields:
                 kwargs.pop(attr)
                 setattr(self, attr, value)
         if kwargs:
@@ -30,18 +28,10 @@ class Model(metaclass=_RegisterMeta):
 
     @classmethod
     def _get_embedded_fields(cls):
-        return [
-            field.name
-            for _, field in inspect.getmembers(cls)
-            if isinstance(field, fields._BaseField) and field.is_embedded
-        ]
+        return cls._embedded_fields
 
     def __repr__(self):
-        fields = [
-            "{} = {}".format(field.name, getattr(self, attr))
-            for attr, field in inspect.getmembers(self.__class__)
-            if isinstance(field, _FIELDS_FOR_REPR)
-        ]
+        fields = ["{} = {}".format(field.name, getattr(self, attr)) for attr, field in self._repr_fields]
         return "{self.__class__.__name__}({fields})".format(self=self, fields=", ".join(fields))
 
     def save(self):
@@ -55,6 +45,16 @@ class Model(metaclass=_RegisterMeta):
     def _manager(self):
         return self.__class__.objects
 
+    @classmethod
+    def _get_record_class(cls):
+        if "_record_class" not in cls.__dict__:
+            cls._record_class = type(
+                "{}Record".format(cls.__name__),
+                (Record,),
+                {**cls._fields, "__slots__": (), "_model": cls},
+            )
+        return cls._record_class
+
     def create(self):
         self._data["id"] = self._manager.create(self._data).id
 
@@ -70,6 +70,73 @@ class Model(metaclass=_RegisterMeta):
         return data
 
 
+class Record:
+    """
+    Compact read-only view of an entity with the same fields as its model:
+
+        for contact in Contact.objects.filter(records=True):
+            print(contact.name, contact.company)
+
+    Only the json of the entity is kept (several times smaller than the decoded dict), it is decoded with the codec
+    of the model interaction on every field access, so read many fields with to_model()
+    """
+
+    __slots__ = ("_raw", "_links")
+    _model = Model
+
+    def __init__(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif not isinstance(data, bytes):
+            data = self._codec.dumps(data)
+        object.__setattr__(self, "_raw", data)
+        object.__setattr__(self, "_links", None)
+
+    def __setattr__(self, attr, value):
+        if attr in self._model._fields:
+            raise AttributeError("{} is read-only, use to_model()".format(self.__class__.__name__))
+        object.__setattr__(self, attr, value)
+
+    @property
+    def _codec(self):
+        manager = getattr(self._model, "objects", None)
+        return manager._interaction._codec if manager is not None else default_codec
+
+    @property
+    def _data(self):
+        return self._codec.loads(self._raw)
+
+    @property
+    def _custom_fields_index(self):
+        # data is decoded on every access, so there is nothing to index
+        return None
+
+    @_custom_fields_index.setter
+    def _custom_fields_index(self, value):
+        pass
+
+    @property
+    def _prefetched(self):
+        if self._links is None:
+            object.__setattr__(self, "_links", {})
+        return self._links
+
+    @property
+    def _path(self):
+        return self._manager._interaction.path
+
+    @property
+    def _manager(self):
+        return self._model.objects
+
+    def to_model(self):
+        return self._model(data=self._data)
+
+    def __repr__(self):
+        fields = ["{} = {}".format(field.name, getattr(self, attr)) for attr, field in self._model._repr_fields]
+        return "{self.__class__.__name__}({fields})".format(self=self, fields=", ".join(fields))
+
+
 def _get_container_by_path(path, data):
     container = {}
     if not path:
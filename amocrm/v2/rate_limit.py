@@ -0,0 +1,100 @@
+import threading
+import time
+
+DEFAULT_RATE = 7  # amoCRM allows 7 requests per second for an integration
+DEFAULT_PERIOD = 1.0
+
+# The same token bucket as the in-process one, but state is kept in redis hash and updated atomically.
+# Redis server time is used so hosts with different clocks share one bucket correctly
+_REDIS_BUCKET_SCRIPT = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local rate = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or rate
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(rate, tokens + math.max(0, now - updated_at) * rate / period)
+local delay = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    delay = (1 - tokens) * period / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("PEXPIRE", KEYS[1], math.ceil(period * 2000))
+return tostring(delay)
+"""
+
+
+def _take_token(tokens, updated_at, now, rate, period):
+    """
+    Refill the bucket for the time passed and take one token.
+    Return new amount of tokens and 0 or how many seconds to wait if there are no tokens
+    """
+    tokens = min(rate, tokens + max(0, now - updated_at) * rate / period)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) * period / rate
+
+
+class RateLimiter:
+    """
+    Token bucket limiter shared by all interactions that use it (thread safe).
+    Every account (subdomain) has its own bucket
+
+    It does nothing until configured, the same way as the default token manager:
+
+        rate_limit.default_rate_limiter(rate=7)
+
+    Pass redis client to share the limit between processes (the same client as for RedisTokensStorage fits)
+    """
+
+    _KEY = "amocrm:rate:limit:{}"
+
+    def __init__(self, rate=None, period=DEFAULT_PERIOD, client=None):
+        self._lock = threading.Lock()
+        self(rate=rate, period=period, client=client)
+
+    def __call__(self, rate=DEFAULT_RATE, period=DEFAULT_PERIOD, client=None):
+        with self._lock:
+            self._rate = rate
+            self._period = period
+            self._client = client
+            self._script = client.register_script(_REDIS_BUCKET_SCRIPT) if client is not None else None
+            self._buckets = {}  # scope -> (tokens, updated_at)
+
+    @property
+    def is_shared(self):
+        """
+        Limit is shared through redis, so acquiring makes a network call
+        """
+        return self._script is not None
+
+    def acquire(self, scope=None):
+        while True:
+            delay = self.try_acquire(scope)
+            if not delay:
+                return
+            time.sleep(delay)
+
+    def try_acquire(self, scope=None) -> float:
+        """
+        Take one token and return 0 or return how many seconds to wait before next try
+        """
+        if not self._rate:
+            return 0
+        if self._script is not None:
+            return float(self._script(keys=[self._KEY.format(scope)], args=[self._rate, self._period]))
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(scope, (self._rate, now))
+            tokens, delay = _take_token(tokens, updated_at, now, self._rate, self._period)
+            self._buckets[scope] = (tokens, now)
+            return delay
+
+
+default_rate_limiter = RateLimiter()
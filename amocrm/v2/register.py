@@ -4,6 +4,7 @@ class _RegisterMeta(type):
     def __new__(cls, name, bases, dct):
         _class = super().__new__(cls, name, bases, dct)
         cls._REGISTER[name] = _class
+        _set_fields_table(_class)
         return _class
 
     @classmethod
@@ -13,3 +14,25 @@ class _RegisterMeta(type):
 
 def get_model_by_name(name):
     return _RegisterMeta.get_model_by_name(name)
+
+
+def _set_fields_table(_class):
+    """
+    Collect field descriptors of the model once, so instances and managers don't have to inspect the class
+    """
+    from . import fields  # fields module imports this one
+
+    table = {}
+    for klass in reversed(_class.__mro__):
+        for attr, value in vars(klass).items():
+            if isinstance(value, fields._BaseField):
+                table[attr] = value
+            else:
+                table.pop(attr, None)
+    _class._fields = dict(sorted(table.items()))
+    _class._embedded_fields = tuple(field.name for field in _class._fields.values() if field.is_embedded)
+    _class._repr_fields = [
+        (attr, field)
+        for attr, field in _class._fields.items()
+        if isinstance(field, (fields._Field, fields._EmbeddedLinkListField, fields._EmbeddedLinkField))
+    ]
@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Optional
+
+
+class StateStorage:
+    """
+    Storage for json serializable state of long running jobs (sync marks, cursors)
+    """
+
+    def get(self, key: str) -> Optional[dict]:
+        pass
+
+    def save(self, key: str, state: dict):
+        pass
+
+
+class MemoryStateStorage(StateStorage):
+    def __init__(self):
+        self._states = {}
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._states.get(key)
+
+    def save(self, key: str, state: dict):
+        self._states[key] = state
+
+
+class FileStateStorage(StateStorage):
+    def __init__(self, directory_path=os.getcwd()):
+        self._directory_path = directory_path
+
+    def _get_path(self, key):
+        return os.path.join(self._directory_path, "{}.state.json".format(key.replace(":", "_")))
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._get_path(key), "r") as _file:
+                return json.load(_file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, state: dict):
+        # write and rename, so the state is never half written
+        path = self._get_path(key)
+        with open(path + ".tmp", "w") as _file:
+            json.dump(state, _file)
+        os.replace(path + ".tmp", path)
+
+
+class RedisStateStorage(StateStorage):
+    _KEY = "amocrm:state:{}"
+
+    def __init__(self, client, ttl=None):
+        self._client = client
+        self._ttl = ttl
+
+    def get(self, key: str) -> Optional[dict]:
+        state = self._client.get(self._KEY.format(key))
+        if state:
+            return json.loads(state)
+        return None
+
+    def save(self, key: str, state: dict):
+        self._client.set(self._KEY.format(key), json.dumps(state), ex=self._ttl)
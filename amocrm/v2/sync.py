@@ -0,0 +1,100 @@
+import time
+from datetime import datetime
+from typing import Optional
+
+from .entity.events import Event
+from .filters import DateRangeFilter, SingleListFilter
+from .interaction import MAX_BATCH_SIZE
+from .state import MemoryStateStorage
+
+DEFAULT_OVERLAP = 60  # seconds, covers clock difference with amoCRM and entities saved while the previous run
+
+_EVENT_ENTITY_TYPES = {"leads": "lead", "contacts": "contact", "companies": "company", "customers": "customer"}
+
+
+class ChangeSet:
+    def __init__(self, updated=(), deleted=()):
+        self.updated = list(updated)
+        self.deleted = list(deleted)
+
+    def __repr__(self):
+        return "ChangeSet(updated={}, deleted={})".format(len(self.updated), len(self.deleted))
+
+
+class IncrementalSync:
+    """
+    Pull only entities changed since the previous run:
+
+        sync = IncrementalSync(Lead, storage=FileStateStorage("/var/lib/amocrm"))
+        for changes in sync.changes():
+            warehouse.upsert(changes.updated)
+            warehouse.delete(changes.deleted)
+
+    The first run pulls everything. The mark is saved only after all change sets are consumed,
+    so an interrupted run is repeated next time (consumers have to be idempotent)
+    """
+
+    def __init__(self, model, storage=None, batch_size=MAX_BATCH_SIZE, overlap=DEFAULT_OVERLAP, entity_type=None):
+        self._model = model
+        self._storage = storage or MemoryStateStorage()
+        self._batch_size = batch_size
+        self._overlap = overlap
+        path = model.objects._interaction.path
+        self._entity_type = entity_type or _EVENT_ENTITY_TYPES.get(path)
+        self._key = "sync:{}".format(path)
+
+    def get_mark(self) -> Optional[int]:
+        """
+        Timestamp of the last finished run
+        """
+        return (self._storage.get(self._key) or {}).get("updated_at")
+
+    def reset(self):
+        self._storage.save(self._key, {})
+
+    def changes(self):
+        since, until = self.get_mark(), int(time.time())
+        filters = ()
+        deleted, restored = set(), set()
+        if since is not None:
+            since -= self._overlap
+            filters = (DateRangeFilter("updated_at")(datetime.fromtimestamp(since), datetime.fromtimestamp(until)),)
+            if self._entity_type is not None:
+                deleted, restored = self._get_deleted(since, until)
+
+        batch, seen = [], set()
+        for instance in self._model.objects.filter(filters=filters):
+            seen.add(instance.id)
+            batch.append(instance)
+            if len(batch) >= self._batch_size:
+                yield ChangeSet(updated=batch)
+                batch = []
+        restored -= seen
+        if restored:
+            batch.extend(self._model.objects.get_many(sorted(restored)))
+        if batch or deleted:
+            yield ChangeSet(updated=batch, deleted=sorted(deleted))
+        self._storage.save(self._key, {"updated_at": until})
+
+    def _get_deleted(self, since, until):
+        """
+        Ids deleted (or merged into other entities) and restored within the period, the last event wins
+        """
+        events = Event.objects.filter(
+            filters=(
+                SingleListFilter("entity")([self._entity_type]),
+                SingleListFilter("type")(
+                    [self._entity_type + "_deleted", self._entity_type + "_restored", "entity_merged"]
+                ),
+                DateRangeFilter("created_at")(datetime.fromtimestamp(since), datetime.fromtimestamp(until)),
+            )
+        )
+        deleted, restored = set(), set()
+        for event in sorted(events, key=lambda event: (event._data["created_at"], event.id)):
+            if event.type.endswith("_restored"):
+                deleted.discard(event.entity_id)
+                restored.add(event.entity_id)
+            else:
+                restored.discard(event.entity_id)
+                deleted.add(event.entity_id)
+        return deleted, restored
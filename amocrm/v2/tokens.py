@@ -1,6 +1,8 @@
 import logging
 import os
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
 from typing import Optional, Tuple
 
 import jwt
@@ -8,8 +10,16 @@ import requests
 
 from . import exceptions
 
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_REFRESH_BEFORE = 60  # seconds before expiration to refresh access token
+DEFAULT_BASE_URL = "https://{subdomain}.amocrm.ru"
+
 
 class TokensStorage:
     def get_access_token(self) -> Optional[str]:
@@ -21,6 +31,13 @@ class TokensStorage:
     def save_tokens(self, access_token: str, refresh_token: str):
         pass
 
+    @contextmanager
+    def lock(self):
+        """
+        Lock to refresh tokens only by one process at once
+        """
+        yield
+
 
 class MemoryTokensStorage(TokensStorage):
     def __init__(self):
@@ -41,6 +58,7 @@ class FileTokensStorage(TokensStorage):
     def __init__(self, directory_path=os.getcwd()):
         self._access_token_path = os.path.join(directory_path, "access_token.txt")
         self._refresh_token_path = os.path.join(directory_path, "refresh_token.txt")
+        self._lock_path = os.path.join(directory_path, "tokens.lock")
 
     @staticmethod
     def _read_file(path):
@@ -63,14 +81,28 @@ class FileTokensStorage(TokensStorage):
         with open(self._refresh_token_path, "w") as _file:
             _file.write(refresh_token)
 
+    @contextmanager
+    def lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "w") as _file:
+            fcntl.flock(_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(_file, fcntl.LOCK_UN)
+
 
 class RedisTokensStorage(TokensStorage):
     _ACCESS_TOKEN_KEY = "amocrm:access:token"
     _REFRESH_TOKEN_KEY = "amocrm:refresh:token"
+    _LOCK_KEY = "amocrm:refresh:lock"
 
-    def __init__(self, client, ttl=None):
+    def __init__(self, client, ttl=None, lock_timeout=30):
         self._ttl = ttl
         self._client = client
+        self._lock_timeout = lock_timeout
 
     def get_access_token(self) -> Optional[str]:
         token = self._client.get(self._ACCESS_TOKEN_KEY)
@@ -88,17 +120,30 @@ class RedisTokensStorage(TokensStorage):
         self._client.set(self._ACCESS_TOKEN_KEY, access_token, ex=self._ttl)
         self._client.set(self._REFRESH_TOKEN_KEY, refresh_token, ex=self._ttl)
 
+    def lock(self):
+        return self._client.lock(self._LOCK_KEY, timeout=self._lock_timeout)
+
 
 class TokenManager:
-    def __init__(self):
+    def __init__(self, refresh_before=DEFAULT_REFRESH_BEFORE):
+        self._refresh_before = refresh_before
+        self._lock = threading.Lock()
         self._client_id = None
         self._client_secret = None
         self.subdomain = None
+        self._base_url = DEFAULT_BASE_URL
         self._redirect_url = None
         self._storage: Optional[TokensStorage] = None
+        self._cached_token: Optional[Tuple[str, float]] = None  # access token and its expiration timestamp
 
     def __call__(
-        self, client_id: str, client_secret: str, subdomain: str, redirect_url: str, storage=FileTokensStorage()
+        self,
+        client_id: str,
+        client_secret: str,
+        subdomain: str,
+        redirect_url: str,
+        storage=FileTokensStorage(),
+        base_url=DEFAULT_BASE_URL,
     ):
         self._client_id = client_id
         self._client_secret = client_secret
@@ -106,6 +151,15 @@ class TokenManager:
         if self._storage is None:
             self._storage = storage
         self.subdomain = subdomain
+        self._base_url = base_url
+        self.reset_cache()
+
+    @property
+    def base_url(self):
+        """
+        Url of the account, could be changed to use a proxy or a fake server
+        """
+        return self._base_url.format(subdomain=self.subdomain)
 
     def init(self, code, skip_error=False):
         data = {
@@ -116,7 +170,7 @@ class TokenManager:
             "client_secret": self._client_secret,
         }
         try:
-            response = requests.post("https://{}.amocrm.ru/oauth2/access_token".format(self.subdomain), json=data)
+            response = requests.post(self.base_url + "/oauth2/access_token", json=data)
         except requests.exceptions.RequestException:
             logger.warning("can't init tokens")
             if not skip_error:
@@ -127,7 +181,7 @@ class TokenManager:
             if response.status_code != 200 and skip_error:
                 return
             response = response.json()
-            self._storage.save_tokens(response["access_token"], response["refresh_token"])
+            self._save_tokens(response["access_token"], response["refresh_token"])
             logger.info("successful init and store tokens in %s store", self._storage)
 
     def _get_new_tokens(self) -> Tuple[str, str]:
@@ -141,27 +195,75 @@ class TokenManager:
             "refresh_token": refresh_token,
             "redirect_uri": self._redirect_url,
         }
-        response = requests.post("https://{}.amocrm.ru/oauth2/access_token".format(self.subdomain), json=body)
+        response = requests.post(self.base_url + "/oauth2/access_token", json=body)
         if response.status_code == 200:
             data = response.json()
             return data["access_token"], data["refresh_token"]
         raise EnvironmentError("Can't refresh token {}".format(response.json()))
 
     def get_access_token(self):
+        token = self.get_cached_access_token()
+        if token:
+            return token
+        with self._lock:
+            # other thread could refresh token while we waited for the lock
+            token = self.get_cached_access_token() or self._get_stored_token()
+            if token:
+                return token
+            with self._storage.lock():
+                # and other process could refresh token while we waited for the storage lock
+                return self._get_stored_token() or self._refresh()
+
+    def get_cached_access_token(self) -> Optional[str]:
+        """
+        Access token if it is cached and fresh, never blocks
+        """
+        cached = self._cached_token
+        if cached and time.time() < cached[1] - self._refresh_before:
+            return cached[0]
+        return None
+
+    def _get_stored_token(self):
         token = self._storage.get_access_token()
         if not token:
             raise exceptions.NoToken("You need to init tokens with code by 'init' method")
-        if self._is_expire(token):
+        if self._is_expire(token, self._refresh_before):
+            return None
+        self._cached_token = (token, self._get_expire(token))
+        return token
+
+    def _refresh(self):
+        token = self._storage.get_access_token()
+        try:
             token, refresh_token = self._get_new_tokens()
-            self._storage.save_tokens(token, refresh_token)
+        except (requests.exceptions.RequestException, EnvironmentError):
+            if self._is_expire(token):
+                raise
+            # token is not expired yet - use it and refresh when it expires
+            logger.warning("can't refresh token before expiration", exc_info=True)
+            self._cached_token = (token, self._get_expire(token) + self._refresh_before)
+            return token
+        self._save_tokens(token, refresh_token)
         return token
 
+    def reset_cache(self):
+        """
+        Forget the cached access token, so the next call goes to the storage
+        (token was rotated by another process or rejected by amocrm)
+        """
+        self._cached_token = None
+
+    def _save_tokens(self, access_token: str, refresh_token: str):
+        self._storage.save_tokens(access_token, refresh_token)
+        self._cached_token = (access_token, self._get_expire(access_token))
+
     @staticmethod
-    def _is_expire(token: str):
-        token_data = jwt.decode(token, options={"verify_signature": False})
-        exp = datetime.utcfromtimestamp(token_data["exp"])
-        now = datetime.utcnow()
-        return now >= exp
+    def _get_expire(token: str) -> float:
+        return jwt.decode(token, options={"verify_signature": False})["exp"]
+
+    @classmethod
+    def _is_expire(cls, token: str, leeway=0):
+        return time.time() >= cls._get_expire(token) - leeway
 
 
 default_token_manager = TokenManager()
@@ -0,0 +1,194 @@
+import re
+import threading
+from urllib.parse import parse_qsl
+
+from .register import get_model_by_name
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+
+_KEY_PART = re.compile(r"\[([^\]]*)\]")
+_MODELS = {
+    "leads": "Lead",
+    "contacts": "Contact",
+    "companies": "Company",
+    "customers": "Customer",
+    "tasks": "Task",
+}
+# webhook names of fields in v4 api
+_RENAMED_FIELDS = {
+    "date_create": "created_at",
+    "last_modified": "updated_at",
+    "created_user_id": "created_by",
+    "modified_user_id": "updated_by",
+}
+_INT_FIELDS = {"price", "created_at", "updated_at", "created_by", "updated_by", "complete_till", "group_id"}
+
+
+def parse(body):
+    """
+    Decode form encoded webhook body (leads[update][0][id]=1&...) into nested dicts and lists:
+
+        {"leads": {"update": [{"id": "1", ...}]}}
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    result = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        name, _, rest = key.partition("[")
+        parts = [name] + (_KEY_PART.findall("[" + rest) if rest else [])
+        container = result
+        for part in parts[:-1]:
+            container = container.setdefault(part, {})
+        container[parts[-1]] = value
+    return _to_lists(result)
+
+
+def _to_lists(value):
+    if not isinstance(value, dict):
+        return value
+    if value and all(key.isdigit() for key in value):
+        return [_to_lists(value[key]) for key in sorted(value, key=int)]
+    return {key: _to_lists(item) for key, item in value.items()}
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def to_entity_data(item):
+    """
+    Convert an entity from webhook to the shape of v4 api, that models consume
+    """
+    data = {}
+    for key, value in item.items():
+        key = _RENAMED_FIELDS.get(key, key)
+        if key == "custom_fields":
+            data["custom_fields_values"] = [
+                {
+                    "field_id": _to_int(field.get("id")),
+                    "field_name": field.get("name"),
+                    "field_code": field.get("code"),
+                    "values": [
+                        {"value": value.get("value"), "enum_id": _to_int(value.get("enum"))}
+                        for value in field.get("values", [])
+                    ],
+                }
+                for field in value
+            ]
+        elif key == "tags":
+            data.setdefault("_embedded", {})["tags"] = value
+        elif key == "id" or key.endswith("_id") or key in _INT_FIELDS:
+            data[key] = _to_int(value)
+        else:
+            data[key] = value
+    return data
+
+
+class WebhookEvent:
+    def __init__(self, entity_type, action, instance, account=None):
+        self.entity_type = entity_type
+        self.action = action
+        self.instance = instance
+        self.account = account
+
+    def __repr__(self):
+        return "WebhookEvent({self.entity_type}, {self.action}, id={self.instance.id})".format(self=self)
+
+
+def get_events(payload, models=None):
+    """
+    Create events with model instances from the parsed webhook
+    """
+    models = {**_MODELS, **(models or {})}
+    account = payload.get("account")
+    events = []
+    for entity_type, actions in payload.items():
+        if entity_type not in models or not isinstance(actions, dict):
+            continue
+        for action, items in actions.items():
+            for item in items if isinstance(items, list) else [items]:
+                _type = entity_type
+                if entity_type == "contacts" and item.get("type") == "company":
+                    _type = "companies"
+                model = models[_type]
+                model = get_model_by_name(model) if isinstance(model, str) else model
+                events.append(WebhookEvent(_type, action, model(data=to_entity_data(item)), account=account))
+    return events
+
+
+class WebhookDispatcher:
+    """
+    Collects events of incoming webhooks and calls handlers with batches of them.
+    It doesn't depend on a web framework, feed it with request bodies:
+
+        dispatcher = WebhookDispatcher(models={"leads": MyLead})
+
+        @dispatcher.on("leads", "status")
+        def on_status_changed(events):
+            for event in events:
+                print(event.instance.status)
+
+        @app.route("/amocrm", methods=["POST"])  # flask, django, aiohttp...
+        def webhook():
+            dispatcher.feed(request.get_data())
+            return ""
+
+    A batch is passed to handlers when it has batch_size events or when flush_interval has passed
+    since the first event of the batch - then handlers are called from a timer thread.
+    Call close() on shutdown to pass the rest of events
+    """
+
+    def __init__(self, models=None, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self._models = models
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._handlers = []  # (entity type, action, handler)
+        self._events = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def on(self, entity_type=None, action=None):
+        """
+        Register handler for events of the entity type and action (all when not given)
+        """
+
+        def register(handler):
+            self._handlers.append((entity_type, action, handler))
+            return handler
+
+        return register
+
+    def feed(self, body):
+        events = get_events(parse(body), models=self._models)
+        with self._lock:
+            if events and not self._events:
+                self._timer = threading.Timer(self._flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            self._events.extend(events)
+            ready = len(self._events) >= self._batch_size
+        if ready:
+            self.flush()
+        return events
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return
+        for entity_type, action, handler in self._handlers:
+            matched = [
+                event for event in events if entity_type in (None, event.entity_type) and action in (None, event.action)
+            ]
+            if matched:
+                handler(matched)
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,14 @@
+import pytest
+
+from tests.conftest import _mock, _token  # noqa: F401 pylint: disable=unused-import
+from tests.data import synthetic
+
+
+@pytest.fixture(scope="session", name="fields")
+def _fields():
+    return synthetic.custom_fields(120)
+
+
+@pytest.fixture(scope="session", name="page")
+def _page(fields):
+    return synthetic.page(size=250, pages=1, fields=fields)
@@ -0,0 +1,20 @@
+import pytest
+
+from amocrm.v2.codec import JsonCodec, OrjsonCodec, orjson
+from tests.data.contacts import LIST_PAGE_1
+
+pytest.importorskip("pytest_benchmark")
+
+CODECS = [JsonCodec()] + ([OrjsonCodec()] if orjson else [])
+PAGE = {**LIST_PAGE_1, "_embedded": {"contacts": LIST_PAGE_1["_embedded"]["contacts"] * 125}}  # 250 contacts
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=lambda codec: type(codec).__name__)
+def test_loads(benchmark, codec):
+    raw = codec.dumps(PAGE)
+    assert benchmark(codec.loads, raw) == PAGE
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=lambda codec: type(codec).__name__)
+def test_dumps(benchmark, codec):
+    benchmark(codec.dumps, PAGE["_embedded"]["contacts"])
@@ -0,0 +1,68 @@
+import pytest
+
+from amocrm.v2 import Contact, Event, custom_field
+from amocrm.v2.codec import default_codec
+from tests.data import synthetic
+
+pytest.importorskip("pytest_benchmark")
+
+
+class ContactWithFields(Contact):
+    first = custom_field.TextCustomField("Поле 1")
+    middle = custom_field.SelectCustomField("Поле 62")
+    last = custom_field.TextCustomField("Поле 119")
+
+
+def test_model_init(benchmark, page):
+    items = page["_embedded"]["contacts"]
+    benchmark(lambda: [Contact(data=item) for item in items])
+
+
+def test_record_init(benchmark, page):
+    items = page["_embedded"]["contacts"]
+    record = Contact._get_record_class()
+    benchmark(lambda: [record(data=item) for item in items])
+
+
+def test_field_get(benchmark, page):
+    contacts = [Contact(data=item) for item in page["_embedded"]["contacts"]]
+    benchmark(lambda: [(contact.name, contact.created_at, contact.updated_at) for contact in contacts])
+
+
+def test_custom_field_get(benchmark, page):
+    contacts = [ContactWithFields(data=item) for item in page["_embedded"]["contacts"]]
+    benchmark(lambda: [(contact.first, contact.middle, contact.last) for contact in contacts])
+
+
+def test_repr_fields(benchmark):
+    benchmark(Contact._get_embedded_fields)
+
+
+def test_pagination(benchmark, response_mock, fields):
+    pages = [synthetic.page(number=number, size=250, pages=4, fields=fields) for number in range(1, 5)]
+    bodies = [default_codec.dumps(page) for page in pages]
+    for body in bodies:
+        response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, body=body)
+
+    def run():
+        return sum(1 for _ in Contact.objects._interaction.get_all())
+
+    assert benchmark.pedantic(run, rounds=1, iterations=1) == 1000
+
+
+def test_pagination_streamed(benchmark, response_mock, fields):
+    pages = [synthetic.page(number=number, size=250, pages=4, fields=fields) for number in range(1, 5)]
+    for page in pages:
+        response_mock.add(
+            "GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, body=default_codec.dumps(page)
+        )
+
+    def run():
+        return sum(1 for _ in Contact.objects._interaction.get_all(stream=True))
+
+    assert benchmark.pedantic(run, rounds=1, iterations=1) == 1000
+
+
+def test_event_value_decoding(benchmark):
+    events = [Event(data=item) for item in synthetic.events(1000)]
+    benchmark(lambda: [(event.value_after, event.value_before) for event in events])
@@ -28,8 +28,11 @@ setup(
     ],
     extras_require={
         'cli': ['python-slugify', ],
+        'async': ['aiohttp', ],
+        'fast': ['orjson', ],
+        'export': ['pyarrow', ],
     },
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     entry_points={
         'console_scripts': [
             'pyamogen=amocrm.v2.cli:main',
@@ -41,7 +44,6 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
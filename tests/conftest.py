@@ -9,7 +9,7 @@ from amocrm.v2.tokens import TokensStorage, default_token_manager
 
 class FakeStorage(TokensStorage):
     def get_access_token(self):
-        token = jwt.encode({"exp": datetime.utcnow() + timedelta(seconds=10)}, "tests")
+        token = jwt.encode({"exp": datetime.utcnow() + timedelta(hours=1)}, "tests")
         if isinstance(token, bytes):
             return token.decode()
         return token
@@ -0,0 +1,130 @@
+"""
+Generator of large realistic payloads (like contacts.py, but with many custom fields) for benchmarks and load tests
+"""
+
+import random
+
+BASE_TIMESTAMP = 1585758065
+FIELD_TYPES = ("text", "numeric", "select", "multiselect", "multitext", "date")
+EVENT_TYPES = ("lead_status_changed", "lead_added", "entity_tag_added", "custom_field_value_changed", "lead_deleted")
+
+
+def custom_fields(count=120, entity_type="contacts"):
+    """
+    Custom fields definitions, the same for every call with the same count
+    """
+    fields = []
+    for i in range(1, count + 1):
+        field_type = FIELD_TYPES[i % len(FIELD_TYPES)]
+        field = {
+            "id": i,
+            "name": "Поле {}".format(i),
+            "code": "FIELD_{}".format(i) if i % 3 == 0 else None,
+            "type": field_type,
+            "sort": i,
+            "entity_type": entity_type,
+            "is_deletable": True,
+            "is_api_only": False,
+            "enums": None,
+        }
+        if field_type in ("select", "multiselect", "multitext"):
+            field["enums"] = [{"id": i * 100 + j, "value": "Значение {}".format(j), "sort": j} for j in range(5)]
+        fields.append(field)
+    return fields
+
+
+def _custom_field_value(field, rnd):
+    if field["enums"]:
+        count = rnd.randint(1, 3) if field["type"] != "select" else 1
+        values = [{"value": enum["value"], "enum_id": enum["id"]} for enum in rnd.sample(field["enums"], count)]
+    elif field["type"] == "numeric":
+        values = [{"value": str(rnd.randint(0, 10**6))}]
+    elif field["type"] == "date":
+        values = [{"value": BASE_TIMESTAMP + rnd.randint(0, 10**7)}]
+    else:
+        values = [{"value": "Текст {}".format(rnd.random())}]
+    return {
+        "field_id": field["id"],
+        "field_name": field["name"],
+        "field_code": field["code"],
+        "field_type": field["type"],
+        "values": values,
+    }
+
+
+def entity(entity_id, fields=None, fill=0.8, seed=None):
+    """
+    Contact/lead like entity with custom fields values for `fill` share of the fields
+    """
+    rnd = random.Random(entity_id if seed is None else seed)
+    fields = custom_fields() if fields is None else fields
+    return {
+        "id": entity_id,
+        "name": "Сущность {}".format(entity_id),
+        "first_name": "Имя",
+        "last_name": "Фамилия",
+        "price": rnd.randint(0, 10**6),
+        "responsible_user_id": 504141,
+        "group_id": 0,
+        "status_id": 142,
+        "pipeline_id": 1,
+        "created_by": 504141,
+        "updated_by": 504141,
+        "created_at": BASE_TIMESTAMP + entity_id,
+        "updated_at": BASE_TIMESTAMP + entity_id * 2,
+        "closest_task_at": None,
+        "custom_fields_values": [_custom_field_value(field, rnd) for field in fields if rnd.random() < fill],
+        "account_id": 28805383,
+        "_links": {"self": {"href": "https://example.amocrm.ru/api/v4/contacts/{}".format(entity_id)}},
+        "_embedded": {
+            "tags": [{"id": 1, "name": "tag"}],
+            "companies": [{"id": rnd.randint(1, 1000)}],
+            "leads": [{"id": rnd.randint(1, 10**6)} for _ in range(rnd.randint(0, 3))],
+        },
+    }
+
+
+def page(field="contacts", number=1, size=250, pages=None, fields=None):
+    """
+    List page as the api returns it, with link to the next page unless it is the last of `pages`
+    """
+    fields = custom_fields() if fields is None else fields
+    start = (number - 1) * size
+    links = {"self": {"href": "https://example.amocrm.ru/api/v4/{}?page={}".format(field, number)}}
+    if pages is None or number < pages:
+        links["next"] = {"href": "https://example.amocrm.ru/api/v4/{}?page={}".format(field, number + 1)}
+    return {
+        "_page": number,
+        "_links": links,
+        "_embedded": {field: [entity(start + i + 1, fields=fields) for i in range(size)]},
+    }
+
+
+def events(count=250, seed=0):
+    rnd = random.Random(seed)
+    result = []
+    for i in range(count):
+        event_type = EVENT_TYPES[i % len(EVENT_TYPES)]
+        value = []
+        if event_type == "lead_status_changed":
+            value = [{"lead_status": {"id": rnd.randint(1, 100), "pipeline_id": 1}}]
+        elif event_type == "lead_added":
+            value = [{"note": {"id": rnd.randint(1, 10**6)}}]
+        elif event_type == "entity_tag_added":
+            value = [{"tag": {"name": "tag {}".format(j)}} for j in range(3)]
+        elif event_type == "custom_field_value_changed":
+            value = [{"custom_field_value": {"field_id": 1, "text": "Текст"}}]
+        result.append(
+            {
+                "id": "01{:024d}".format(i),
+                "type": event_type,
+                "entity_id": rnd.randint(1, 10**6),
+                "entity_type": "lead",
+                "created_by": 504141,
+                "created_at": BASE_TIMESTAMP + i,
+                "value_after": value,
+                "value_before": value,
+                "account_id": 28805383,
+            }
+        )
+    return result
@@ -0,0 +1,234 @@
+"""
+Local stand-in for amoCRM api v4 to run load and concurrency tests without a real account:
+
+    with FakeAmoCRM(entities={"contacts": 10000}, rate=7) as server:
+        default_token_manager(..., subdomain="test", storage=MemoryTokensStorage(), base_url=server.base_url)
+        default_token_manager.init(code=server.code)
+        ...
+
+It supports pagination with _links.next, the 250 items limit, filter[id][], filter[<field>][from|to], query, with=,
+bulk POST/PATCH with request_id, 429 on exceeded rate and expiring access tokens with refresh tokens rotation
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+
+from .data import synthetic
+
+MAX_LIMIT = 250
+_SECRET = "fake-amocrm-secret-key-for-local-tests"
+_RANGE_FILTER = re.compile(r"^filter\[(\w+)\]\[(from|to)\]$")
+
+
+class FakeAmoCRM:
+    def __init__(self, entities=None, custom_fields=20, rate=None, token_lifetime=3600):
+        self.code = "code"
+        self.token_lifetime = token_lifetime
+        self.rate = rate
+        self.requests = []  # (method, path) of every request
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._refresh_tokens = set()
+        self._window = (0, 0)  # second, requests in it
+        fields = synthetic.custom_fields(custom_fields)
+        self.entities = {
+            path: {item["id"]: item for item in (synthetic.entity(i, fields=fields) for i in range(1, count + 1))}
+            for path, count in (entities or {"contacts": 100, "leads": 100, "companies": 100}).items()
+        }
+        self.custom_fields = {path: fields for path in self.entities}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _get_handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:{}".format(self._server.server_address[1])
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def issue_tokens(self):
+        refresh_token = uuid.uuid4().hex
+        access_token = jwt.encode({"exp": time.time() + self.token_lifetime, "jti": uuid.uuid4().hex}, _SECRET)
+        if isinstance(access_token, bytes):
+            access_token = access_token.decode()
+        self._refresh_tokens.add(refresh_token)
+        return {
+            "token_type": "Bearer",
+            "expires_in": self.token_lifetime,
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+        }
+
+    # handlers return status and body
+
+    def oauth(self, data):
+        with self._lock:
+            if data.get("grant_type") == "authorization_code" and data.get("code") == self.code:
+                return 200, self.issue_tokens()
+            if data.get("grant_type") == "refresh_token" and data.get("refresh_token") in self._refresh_tokens:
+                self._refresh_tokens.remove(data["refresh_token"])  # refresh token is one-off
+                return 200, self.issue_tokens()
+        return 400, {"hint": "Wrong code or refresh token"}
+
+    def is_authorized(self, header):
+        try:
+            jwt.decode((header or "").replace("Bearer ", ""), _SECRET, algorithms=["HS256"])
+        except jwt.PyJWTError:
+            return False
+        return True
+
+    def is_throttled(self):
+        if not self.rate:
+            return False
+        with self._lock:
+            second, count = self._window
+            now = int(time.time())
+            count = count + 1 if now == second else 1
+            self._window = (now, count)
+            if count > self.rate:
+                self.throttled += 1
+                return True
+        return False
+
+    def list(self, path, query):
+        items = list(self.entities[path].values())
+        limit, page = int(query.get("limit", [MAX_LIMIT])[0]), int(query.get("page", [1])[0])
+        if limit > MAX_LIMIT:
+            return 400, {"title": "Bad Request", "detail": "Limit is more than {}".format(MAX_LIMIT)}
+        ids = {int(_id) for _id in query.get("filter[id][]", [])}
+        if ids:
+            items = [item for item in items if item["id"] in ids]
+        for key, values in query.items():
+            match = _RANGE_FILTER.match(key)
+            if match:
+                name, bound, value = match.group(1), match.group(2), int(values[0])
+                items = [item for item in items if (item[name] >= value if bound == "from" else item[name] <= value)]
+        if "query" in query:
+            items = [item for item in items if query["query"][0] in item["name"]]
+        for key, values in query.items():
+            if key.startswith("order["):
+                items.sort(key=lambda item, name=key[6:-1]: item[name], reverse=values[0] == "desc")
+        items = items[(page - 1) * limit : page * limit + 1]
+        if not items:
+            return 204, None
+        links = {"self": {"href": "/api/v4/{}?page={}".format(path, page)}}
+        if len(items) > limit:
+            links["next"] = {"href": "/api/v4/{}?page={}".format(path, page + 1)}
+        embedded = [_with(item, query) for item in items[:limit]]
+        return 200, {"_page": page, "_links": links, "_embedded": {path: embedded}}
+
+    def get(self, path, object_id, query):
+        item = self.entities[path].get(object_id)
+        if item is None:
+            return 204, None
+        return 200, _with(item, query)
+
+    def save(self, path, data, create):
+        if not isinstance(data, list) or len(data) > MAX_LIMIT:
+            return 400, {"title": "Bad Request", "detail": "Up to {} entities are allowed".format(MAX_LIMIT)}
+        result = []
+        with self._lock:
+            for item in data:
+                if create:
+                    item = {**item, "id": max(self.entities[path], default=0) + 1, "created_at": int(time.time())}
+                    self.entities[path][item["id"]] = item
+                elif item.get("id") not in self.entities[path]:
+                    return 400, {"title": "Bad Request", "detail": "No entity {}".format(item.get("id"))}
+                else:
+                    self.entities[path][item["id"]].update(item)
+                self.entities[path][item["id"]]["updated_at"] = int(time.time())
+                result.append({"id": item["id"], "request_id": item.get("request_id")})
+        return 200, {"_embedded": {path: result}}
+
+
+def _with(item, query):
+    """
+    Keep only embedded entities requested with `with` param, as amoCRM does (tags are always there)
+    """
+    requested = set(query.get("with", [""])[0].split(",")) | {"tags"}
+    embedded = {key: value for key, value in item.get("_embedded", {}).items() if key in requested}
+    return {**item, "_embedded": embedded}
+
+
+def _get_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=None, headers=None):
+            content = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/hal+json")
+            self.send_header("Content-Length", str(len(content)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def _read(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length)) if length else None
+
+        def _handle(self, method):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            data = self._read()
+            server.requests.append((method, url.path))
+            if url.path == "/oauth2/access_token":
+                return self._send(*server.oauth(data or {}))
+            if server.is_throttled():
+                return self._send(429, {"title": "Too Many Requests"}, headers={"Retry-After": "1"})
+            if not server.is_authorized(self.headers.get("Authorization")):
+                return self._send(401, {"title": "Unauthorized"})
+            parts = url.path[len("/api/v4/") :].strip("/").split("/")
+            if parts[-1] == "custom_fields" and parts[0] in server.custom_fields:
+                return self._send(200, {"_embedded": {"custom_fields": server.custom_fields[parts[0]]}})
+            if not url.path.startswith("/api/v4/") or parts[0] not in server.entities or len(parts) > 2:
+                return self._send(404, {"title": "Not Found"})
+            path = parts[0]
+            if method == "GET" and len(parts) == 1:
+                return self._send(*server.list(path, query))
+            if method == "GET":
+                return self._send(*server.get(path, int(parts[1]), query))
+            if method == "POST" and len(parts) == 1:
+                return self._send(*server.save(path, data, create=True))
+            if method == "PATCH" and len(parts) == 1:
+                return self._send(*server.save(path, data, create=False))
+            if method == "PATCH":
+                status, body = server.save(path, [{**data, "id": int(parts[1])}], create=False)
+                return self._send(status, body and server.entities[path].get(int(parts[1])))
+            return self._send(405, {"title": "Method Not Allowed"})
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_PATCH(self):
+            self._handle("PATCH")
+
+    return Handler
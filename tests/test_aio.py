@@ -0,0 +1,148 @@
+import asyncio
+import json
+import re
+import threading
+
+import pytest
+
+pytest.importorskip("aiohttp")
+aioresponses = pytest.importorskip("aioresponses").aioresponses
+
+from amocrm.v2 import Contact, Event, User, exceptions  # noqa: E402 pylint: disable=wrong-import-position
+from amocrm.v2.aio import AsyncManager  # noqa: E402 pylint: disable=wrong-import-position
+from amocrm.v2.tokens import default_token_manager  # noqa: E402 pylint: disable=wrong-import-position
+
+from .data.contacts import DETAIL_INFO, LIST_PAGE_1, LIST_PAGE_2  # noqa: E402 pylint: disable=wrong-import-position
+
+CONTACTS_URL = re.compile(r"^https://test\.amocrm\.ru/api/v4/contacts\?.*$")
+CONTACT_URL = re.compile(r"^https://test\.amocrm\.ru/api/v4/contacts/3(\?.*)?$")
+
+
+def _run(coroutine_function, model=Contact):
+    """
+    Run in a new loop without asyncio.run: on python 3.11 it checks its SIGINT handler with signal.getsignal,
+    which formats repr of the handler with the main task and so the returned instance. Model repr reads linked
+    entities, and here they are requested synchronously from the network that tests don't have (with retries)
+    """
+
+    async def run():
+        manager = AsyncManager.for_model(model)
+        try:
+            return await coroutine_function(manager)
+        finally:
+            await manager.close()
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+def _calls(mocked):
+    return [call for calls in mocked.requests.values() for call in calls]
+
+
+def test_get():
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, payload=DETAIL_INFO)
+        contact = _run(lambda manager: manager.get(3))
+    assert contact.id == 3
+    assert contact.first_name == "Иван"
+
+
+def test_get_not_found():
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, status=204)
+        with pytest.raises(exceptions.NotFound):
+            _run(lambda manager: manager.get(3))
+
+
+def test_filter_pagination():
+    async def collect(manager):
+        return [contact.name async for contact in manager.filter(query="test")]
+
+    with aioresponses() as mocked:
+        mocked.get(CONTACTS_URL, payload=LIST_PAGE_1)
+        mocked.get(CONTACTS_URL, payload=LIST_PAGE_2)
+        names = _run(collect)
+        pages = [call.kwargs["params"]["page"] for call in _calls(mocked)]
+    assert names == ["1", "dsgdsg", "1"]
+    assert pages == [1, 2]
+
+
+def test_for_model_limit():
+    async def collect(manager):
+        return [event.id async for event in manager.all()]
+
+    with aioresponses() as mocked:
+        mocked.get(
+            re.compile(r"^https://test\.amocrm\.ru/api/v4/events\?.*$"),
+            payload={"_embedded": {"events": [{"id": "a", "type": "lead_added"}]}},
+        )
+        assert _run(collect, model=Event) == ["a"]
+        assert _calls(mocked)[0].kwargs["params"]["limit"] == 100
+
+
+def test_for_model_custom_interaction():
+    with pytest.raises(TypeError):
+        AsyncManager.for_model(User)
+
+
+def test_retry():
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, status=429, headers={"Retry-After": "0"})
+        mocked.get(CONTACT_URL, status=502, headers={"Retry-After": "0"})
+        mocked.get(CONTACT_URL, payload=DETAIL_INFO)
+        assert _run(lambda manager: manager.get(3)).id == 3
+        assert len(_calls(mocked)) == 3
+
+
+def test_retry_exhausted():
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, status=429, headers={"Retry-After": "0"}, repeat=True)
+        with pytest.raises(exceptions.TooManyRequests):
+            _run(lambda manager: manager.get(3))
+        assert len(_calls(mocked)) == 4
+
+
+def test_unauthorized_retried_once():
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, status=401)
+        mocked.get(CONTACT_URL, payload=DETAIL_INFO)
+        assert _run(lambda manager: manager.get(3)).id == 3
+
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, status=401, repeat=True)
+        with pytest.raises(exceptions.UnAuthorizedException):
+            _run(lambda manager: manager.get(3))
+        assert len(_calls(mocked)) == 2
+
+
+def test_bulk_create():
+    with aioresponses() as mocked:
+        mocked.post(
+            "https://test.amocrm.ru/api/v4/contacts",
+            payload={"_embedded": {"contacts": [{"id": 11, "request_id": "1"}, {"id": 10, "request_id": "0"}]}},
+        )
+        contacts = _run(lambda manager: manager.bulk_create([Contact(name="0"), Contact(name="1")]))
+        body = json.loads(_calls(mocked)[0].kwargs["data"])
+    assert [contact.id for contact in contacts] == [10, 11]
+    assert body == [{"name": "0", "request_id": "0"}, {"name": "1", "request_id": "1"}]
+
+
+def test_token_read_outside_event_loop(monkeypatch):
+    threads = []
+    get_access_token = default_token_manager.get_access_token
+
+    def tracked_get_access_token():
+        threads.append(threading.current_thread())
+        return get_access_token()
+
+    monkeypatch.setattr(default_token_manager, "get_access_token", tracked_get_access_token)
+    default_token_manager.reset_cache()
+    with aioresponses() as mocked:
+        mocked.get(CONTACT_URL, payload=DETAIL_INFO)
+        assert _run(lambda manager: manager.get(3)).id == 3
+        assert len(threads) == 1
+        assert threads[0] is not threading.main_thread()
@@ -0,0 +1,74 @@
+import pytest
+
+from amocrm.v2 import User
+from amocrm.v2 import cache
+from amocrm.v2.cache import ResponseCache
+from amocrm.v2.interaction import GenericInteraction
+
+from .data.users import DETAIL_INFO
+
+URL = "https://test.amocrm.ru/api/v4/users/3"
+
+
+@pytest.fixture(name="cache")
+def _cache(tmpdir):
+    return ResponseCache(str(tmpdir.join("cache.sqlite")), ttls={"users*": 60})
+
+
+def test_cached_response(response_mock, cache, monkeypatch):
+    monkeypatch.setattr(User.objects._interaction, "_cache", cache)
+    response_mock.add("GET", URL, json=DETAIL_INFO, headers={"ETag": '"v1"'})
+
+    assert User.objects.get(3).name == User.objects.get(3).name == DETAIL_INFO["name"]
+    assert len(response_mock.calls) == 1
+
+
+def test_expired_response_revalidated(response_mock, cache):
+    interaction = GenericInteraction(path="users", cache=cache)
+    response_mock.add("GET", URL, json=DETAIL_INFO, headers={"ETag": '"v1"'})
+    response_mock.add("GET", URL, status=304)
+
+    assert interaction.get(3) == DETAIL_INFO
+    key = cache.get_key("test", "users/3", {})
+    cache.touch(key, -1)
+    assert interaction.get(3) == DETAIL_INFO
+    assert response_mock.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert cache.get(key)[3]  # fresh again
+
+
+def test_cache_invalidated_on_write(response_mock, cache):
+    interaction = GenericInteraction(path="users", cache=cache)
+    response_mock.add("GET", URL, json=DETAIL_INFO)
+    response_mock.add("PATCH", URL, json=DETAIL_INFO)
+
+    interaction.get(3)
+    interaction.update(3, {"name": "new"})
+    interaction.get(3)
+    assert [call.request.method for call in response_mock.calls] == ["GET", "PATCH", "GET"]
+
+
+def test_not_cached_paths(response_mock, cache):
+    interaction = GenericInteraction(path="contacts", cache=cache)
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts/3", json=DETAIL_INFO)
+
+    interaction.get(3)
+    interaction.get(3)
+    assert len(response_mock.calls) == 2
+
+
+def test_ttl_cache(monkeypatch):
+    now = [0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    loads = []
+    ttl_cache = cache.TTLCache(load=lambda key: loads.append(key) or len(loads), ttl=10)
+
+    assert (ttl_cache.get("a"), ttl_cache.get("a"), ttl_cache.get("b")) == (1, 1, 2)
+    assert ttl_cache.reload("a", min_interval=5) == 1
+    now[0] = 5
+    assert ttl_cache.reload("a", min_interval=5) == 3
+    now[0] = 14
+    assert (ttl_cache.get("a"), ttl_cache.get("b")) == (3, 4)
+    ttl_cache.invalidate("a")
+    assert (ttl_cache.get("a"), ttl_cache.get("b")) == (5, 4)
+    ttl_cache.invalidate()
+    assert ttl_cache.get("b") == 6
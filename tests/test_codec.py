@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from amocrm.v2 import Contact
+from amocrm.v2.codec import JsonCodec, OrjsonCodec, default_codec, orjson
+from amocrm.v2.interaction import GenericInteraction
+
+from .data.contacts import DETAIL_INFO
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [JsonCodec(), pytest.param("orjson", marks=pytest.mark.skipif(not orjson, reason="orjson is not installed"))],
+)
+def test_codec_per_interaction(response_mock, codec):
+    codec = OrjsonCodec() if codec == "orjson" else codec
+    response_mock.add("PATCH", "https://test.amocrm.ru/api/v4/contacts/3", json=DETAIL_INFO)
+    interaction = GenericInteraction(path="contacts", codec=codec)
+
+    assert interaction.update(3, {"name": "Имя"}) == DETAIL_INFO
+    request = response_mock.calls[0].request
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(request.body) == {"name": "Имя"}
+
+
+def test_default_codec():
+    assert isinstance(default_codec, OrjsonCodec if orjson else JsonCodec)
+    assert Contact.objects._interaction._codec is default_codec
@@ -1,7 +1,13 @@
+import json
+import threading
+import time
+import tracemalloc
+
 import pytest
 
-from amocrm.v2 import Contact, exceptions, filters
+from amocrm.v2 import Contact, exceptions, fields, filters
 
+from .data import synthetic
 from .data.companies import DETAIL_INFO as COMPANY_DETAIL_INFO, DETAIL_INFO_2
 from .data.contacts import (CREATE_DATA, DETAIL_INFO, LIST_PAGE_1, LIST_PAGE_2,
                             UPDATE)
@@ -47,6 +53,69 @@ def test_list(response_mock):
     assert contacts[0].name == "1"
 
 
+def test_list_prefetch(response_mock):
+    pages = {"1": LIST_PAGE_1, "2": LIST_PAGE_2}
+
+    def callback(request):
+        page = request.params["page"]
+        if page not in pages:
+            return 204, {}, ""
+        return 200, {}, json.dumps(pages[page])
+
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/contacts", callback=callback)
+
+    contacts = list(Contact.objects.filter(prefetch=3))
+    assert [contact.id for contact in contacts] == [7143599, 7767065, 7143599]
+    # pages after the last one are requested at most prefetch - 1 times (unless cancelled before sending)
+    pages = sorted(call.request.params["page"] for call in response_mock.calls)
+    assert pages[:2] == ["1", "2"] and len(pages) <= 2 + 2
+
+
+def test_list_prefetch_concurrent(response_mock):
+    lock, active, concurrency = threading.Lock(), [0], []
+
+    def callback(request):
+        with lock:
+            active[0] += 1
+            concurrency.append(active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        page = int(request.params["page"])
+        if page > 5:
+            return 204, {}, ""
+        return 200, {}, json.dumps(LIST_PAGE_1 if page < 5 else LIST_PAGE_2)
+
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/contacts", callback=callback)
+
+    assert len(list(Contact.objects.filter(prefetch=4))) == 9
+    assert max(concurrency) == 4
+    assert len(response_mock.calls) <= 5 + 3
+
+
+def test_list_prefetch_single_page(response_mock):
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, status=200, json=LIST_PAGE_2
+    )
+
+    assert len(list(Contact.objects.filter(prefetch=4))) == 1
+    assert 1 <= len(response_mock.calls) <= 4
+
+
+def test_list_prefetch_error(response_mock):
+    def callback(request):
+        if request.params["page"] == "1":
+            return 200, {}, json.dumps(LIST_PAGE_1)
+        return 403, {}, ""
+
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/contacts", callback=callback)
+
+    contacts = Contact.objects.filter(prefetch=2)
+    assert next(contacts).id == 7143599
+    with pytest.raises(exceptions.PermissionsDenyException):
+        list(contacts)
+
+
 def test_list_filter(response_mock):
     response_mock.add(
         "GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, status=200, json=LIST_PAGE_2
@@ -79,11 +148,130 @@ def test_update(response_mock):
 
 def test_repr(response_mock):
     response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts/3", match_querystring=False, json=DETAIL_INFO)
-    response_mock.add("GET",
-                      "https://test.amocrm.ru/api/v4/companies/1?with=contacts%2Ccustomers%2Cleads%2Ctags",
-                      match_querystring=False,
-                      json=DETAIL_INFO_2)
+    response_mock.add(
+        "GET",
+        "https://test.amocrm.ru/api/v4/companies/1?with=contacts%2Ccustomers%2Cleads%2Ctags",
+        match_querystring=False,
+        json=DETAIL_INFO_2,
+    )
     contact = Contact.objects.get(3)
 
     representation = repr(contact)
     assert representation
+
+
+def test_bulk_create(response_mock):
+    response_mock.add(
+        "POST",
+        "https://test.amocrm.ru/api/v4/contacts",
+        status=200,
+        json={"_embedded": {"contacts": [{"id": 10, "request_id": "0"}, {"id": 11, "request_id": "1"}]}},
+    )
+    response_mock.add(
+        "POST",
+        "https://test.amocrm.ru/api/v4/contacts",
+        status=200,
+        json={"_embedded": {"contacts": [{"id": 12, "request_id": "0"}]}},
+    )
+    contacts = [Contact(name=str(i)) for i in range(3)]
+    Contact.objects.bulk_create(contacts, batch_size=2)
+
+    assert [contact.id for contact in contacts] == [10, 11, 12]
+    assert not any(contact._updated_fields for contact in contacts)
+    assert len(response_mock.calls) == 2
+    assert json.loads(response_mock.calls[0].request.body) == [
+        {"name": "0", "request_id": "0"},
+        {"name": "1", "request_id": "1"},
+    ]
+    assert "request_id" not in contacts[0]._data
+
+
+def test_bulk_create_maps_ids_by_request_id(response_mock):
+    response_mock.add(
+        "POST",
+        "https://test.amocrm.ru/api/v4/contacts",
+        status=200,
+        json={"_embedded": {"contacts": [{"id": 11, "request_id": "1"}, {"id": 10, "request_id": "0"}]}},
+    )
+    contacts = Contact.objects.bulk_create([Contact(name="0"), Contact(name="1")])
+    assert [contact.id for contact in contacts] == [10, 11]
+
+
+def test_bulk_create_short_response(response_mock):
+    response_mock.add(
+        "POST",
+        "https://test.amocrm.ru/api/v4/contacts",
+        status=200,
+        json={"_embedded": {"contacts": [{"id": 10, "request_id": "0"}]}},
+    )
+    contacts = [Contact(name="0"), Contact(name="1")]
+    with pytest.raises(exceptions.AmoApiException):
+        Contact.objects.bulk_create(contacts)
+    assert contacts[0].id == 10
+    assert contacts[1].id is None
+
+
+def test_bulk_update(response_mock):
+    response_mock.add("PATCH", "https://test.amocrm.ru/api/v4/contacts", status=200, json=UPDATE)
+    first, second = Contact(data={"id": 3, "name": "a"}), Contact(data={"id": 4, "name": "b"})
+    first.name = "new"
+
+    assert Contact.objects.bulk_update([first, second]) == [first]
+    assert len(response_mock.calls) == 1
+    assert json.loads(response_mock.calls[0].request.body) == [{"id": 3, "name": "new"}]
+    assert not first._updated_fields
+
+
+def test_fields_table():
+    class ContactWithNote(Contact):
+        name = None  # not a field anymore
+        note = fields._Field("note", blank=True)
+
+    assert Contact._get_embedded_fields() == ("companies", "leads", "tags")
+    assert "name" in Contact._fields and "objects" not in Contact._fields
+    assert "name" not in ContactWithNote._fields and "note" in ContactWithNote._fields
+    assert ContactWithNote(note="text").note == "text"
+    with pytest.raises(ValueError):
+        Contact(unknown=1)
+
+
+def test_list_records(response_mock):
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=LIST_PAGE_2)
+
+    records = list(Contact.objects.filter(records=True))
+    assert records and all(not hasattr(record, "__dict__") for record in records)
+    assert records[0].name == LIST_PAGE_2["_embedded"]["contacts"][0]["name"]
+    with pytest.raises(AttributeError):
+        records[0].name = "new"
+
+    contact = records[0].to_model()
+    assert isinstance(contact, Contact)
+    contact.name = "new"
+    assert contact._updated_fields
+
+
+def test_record_from_raw_json():
+    record = Contact._get_record_class()(json.dumps({"id": 3, "name": "raw"}))
+    assert record._raw == b'{"id": 3, "name": "raw"}'
+    assert (record.id, record.name) == (3, "raw")
+
+
+def test_records_memory():
+    items = [synthetic.entity(i) for i in range(100)]
+    record_class = Contact._get_record_class()
+
+    tracemalloc.start()
+    try:
+        records = [record_class(item) for item in items]
+        records_size = tracemalloc.get_traced_memory()[0]
+        del items
+        tracemalloc.clear_traces()
+        contacts = [Contact(data=synthetic.entity(i)) for i in range(100)]
+        models_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert records_size * 3 < models_size
+    assert records[0].name == contacts[0].name
+    assert records[0]._data is not records[0]._data  # decoded data is not kept
+
+
@@ -0,0 +1,54 @@
+import pytest
+import requests
+
+from amocrm.v2 import Contact, exceptions, filters
+from amocrm.v2.cursor import Cursor
+
+from .data.contacts import LIST_PAGE_1, LIST_PAGE_2
+
+URL = "https://test.amocrm.ru/api/v4/contacts"
+IDS_1 = [item["id"] for item in LIST_PAGE_1["_embedded"]["contacts"]]
+IDS_2 = [item["id"] for item in LIST_PAGE_2["_embedded"]["contacts"]]
+
+
+@pytest.fixture(name="interaction")
+def _interaction(monkeypatch):
+    interaction = Contact.objects._interaction
+    monkeypatch.setattr(interaction, "_backoff", 0)
+    return interaction
+
+
+def test_failed_page_retried(response_mock, interaction):
+    response_mock.add("GET", URL, match_querystring=False, json=LIST_PAGE_1)
+    response_mock.add("GET", URL, match_querystring=False, body=requests.exceptions.ConnectionError("reset"))
+    response_mock.add("GET", URL, match_querystring=False, json=LIST_PAGE_2)
+
+    assert [contact.id for contact in Contact.objects.filter(cursor=Cursor())] == IDS_1 + IDS_2
+    assert len(response_mock.calls) == 3
+
+
+def test_cursor_resume(response_mock, interaction, monkeypatch):
+    monkeypatch.setattr(interaction, "_retries", 0)
+    response_mock.add("GET", URL, match_querystring=False, json=LIST_PAGE_1)
+    response_mock.add("GET", URL, match_querystring=False, body=requests.exceptions.ConnectionError("reset"))
+    cursor = Cursor()
+
+    with pytest.raises(exceptions.AmoApiException):
+        for _ in Contact.objects.filter(filters=(filters.SingleFilter("name")("1"),), cursor=cursor):
+            pass
+    assert (cursor.page, cursor.last_id, cursor.finished) == (2, IDS_1[-1], False)
+
+    response_mock.reset()
+    response_mock.add("GET", URL, match_querystring=False, json=LIST_PAGE_2)
+    cursor = Cursor.loads(cursor.dumps())
+    assert [contact.id for contact in Contact.objects.filter(cursor=cursor)] == IDS_2
+    assert cursor.finished
+    request = response_mock.calls[0].request
+    assert "page=2" in request.url and "filter%5Bname%5D=1" in request.url
+
+
+def test_cursor_skips_yielded_items(response_mock):
+    response_mock.add("GET", URL, match_querystring=False, json={"_embedded": LIST_PAGE_1["_embedded"]})
+    cursor = Cursor(path="contacts", params={"limit": 250}, page=1, last_id=IDS_1[0])
+
+    assert [contact.id for contact in Contact.objects.filter(cursor=cursor)] == IDS_1[1:]
@@ -0,0 +1,141 @@
+import pytest
+
+from amocrm.v2 import Contact, custom_field
+
+CUSTOM_FIELDS = {
+    "_embedded": {
+        "custom_fields": [
+            {"id": 1, "name": "Адрес", "code": None, "sort": 1, "type": "text", "entity_type": "contacts"},
+            {
+                "id": 2,
+                "name": "Тип",
+                "code": "KIND",
+                "sort": 2,
+                "type": "select",
+                "entity_type": "contacts",
+                "enums": [{"id": 10, "value": "first", "sort": 1}, {"id": 11, "value": "second", "sort": 2}],
+            },
+        ]
+    }
+}
+
+
+class ContactWithFields(Contact):
+    address = custom_field.TextCustomField("Адрес")
+    kind = custom_field.SelectCustomField("Kind", code="KIND")
+
+
+@pytest.fixture(autouse=True)
+def _registry():
+    custom_field.custom_fields_registry.invalidate()
+    yield
+    custom_field.custom_fields_registry.invalidate()
+
+
+def test_fields_schema_requested_once(response_mock):
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/contacts/custom_fields", match_querystring=False, json=CUSTOM_FIELDS
+    )
+    contact = ContactWithFields(data={"id": 1})
+    contact.address = "Москва"
+    contact.kind = "first"
+
+    assert len(response_mock.calls) == 1
+    assert contact._data["custom_fields_values"] == [
+        {"field_id": 1, "field_name": "Адрес", "values": [{"value": "Москва"}]},
+        {"field_id": 2, "field_code": "KIND", "field_name": "Kind", "values": [{"value": "first", "enum_id": 10}]},
+    ]
+
+
+def test_select_enum_id(response_mock):
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/contacts/custom_fields", match_querystring=False, json=CUSTOM_FIELDS
+    )
+    contact = ContactWithFields(
+        data={"id": 1, "custom_fields_values": [{"field_id": 2, "field_code": "KIND", "values": []}]}
+    )
+
+    contact.kind = "second"
+    assert contact._data["custom_fields_values"][0]["values"] == [{"value": "second", "enum_id": 11}]
+    contact.kind = "unknown"
+    assert contact._data["custom_fields_values"][0]["values"] == [{"value": "unknown"}]
+    contact.kind = custom_field.SelectValue(id=10, value="first")
+    assert contact._data["custom_fields_values"][0]["values"] == [{"value": "first", "enum_id": 10}]
+    assert len(response_mock.calls) == 1
+
+
+def test_registry(response_mock):
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/contacts/custom_fields", match_querystring=False, json=CUSTOM_FIELDS
+    )
+    registry = custom_field.CustomFieldsRegistry()
+
+    assert registry.find("contacts", name="Адрес").id == 1
+    assert registry.find("contacts", name="unknown", code="KIND").id == 2
+    assert registry.find("contacts", field_id=2).name == "Тип"
+    assert registry.find("contacts", name="unknown") is None
+    assert registry.get_enums("contacts", 2) == {"first": 10, "second": 11}
+    assert len(response_mock.calls) == 1
+
+    registry.invalidate("contacts")
+    assert [field.id for field in registry.get_fields("contacts")] == [1, 2]
+    assert len(response_mock.calls) == 2
+
+
+def test_custom_fields_index():
+    class ContactWithIndexedFields(Contact):
+        address = custom_field.TextCustomField("Адрес")
+        kind = custom_field.SelectCustomField("Kind", code="KIND")
+
+    contact = ContactWithIndexedFields(
+        data={
+            "id": 1,
+            "custom_fields_values": [
+                {"field_id": 5, "field_name": "Kind", "values": [{"value": "by name", "enum_id": 1}]},
+                {
+                    "field_id": 2,
+                    "field_code": "KIND",
+                    "field_name": "Тип",
+                    "values": [{"value": "by code", "enum_id": 2}],
+                },
+                {"field_id": 1, "field_name": "Адрес", "values": [{"value": "Москва"}]},
+            ],
+        }
+    )
+    assert contact.address == "Москва"
+    assert contact.kind.value == "by name"
+    index = contact._custom_fields_index
+    assert contact.address == "Москва"
+    assert contact._custom_fields_index is index
+
+    contact.address = "Казань"
+    assert contact.address == "Казань"
+    assert contact._custom_fields_index is index
+
+    contact._data["custom_fields_values"] = [{"field_id": 1, "field_name": "Адрес", "values": [{"value": "Омск"}]}]
+    assert contact.address == "Омск"
+
+
+def test_custom_field_matched_by_id():
+    class ContactWithFieldIds(Contact):
+        kind = custom_field.SelectCustomField("Kind", code="KIND", field_id=2)
+
+    contact = ContactWithFieldIds(
+        data={
+            "custom_fields_values": [
+                {"field_id": 5, "field_name": "Kind", "values": [{"value": "by name", "enum_id": 1}]},
+                {"field_id": 2, "field_name": "Тип", "values": [{"value": "by id", "enum_id": 2}]},
+            ],
+        }
+    )
+    assert contact.kind.value == "by id"
+
+
+def test_custom_fields_on_record():
+    class ContactWithIndexedFields(Contact):
+        address = custom_field.TextCustomField("Адрес")
+
+    record = ContactWithIndexedFields._get_record_class()(
+        data={"id": 1, "custom_fields_values": [{"field_id": 1, "field_name": "Адрес", "values": [{"value": "Омск"}]}]}
+    )
+    assert record.address == "Омск"
@@ -0,0 +1,87 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from amocrm.v2 import Event
+from amocrm.v2.cursor import Cursor
+from amocrm.v2.entity import events
+from amocrm.v2.state import MemoryStateStorage
+
+URL = "https://test.amocrm.ru/api/v4/events"
+
+
+def _page(*items):
+    return {
+        "_embedded": {
+            "events": [
+                {"id": event_id, "type": "lead_added", "entity_id": 1, "entity_type": "lead", "created_at": created_at}
+                for event_id, created_at in items
+            ]
+        }
+    }
+
+
+@pytest.fixture(name="sleeps")
+def _sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(events.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_stream(response_mock, sleeps):
+    response_mock.add("GET", URL, match_querystring=False, json=_page(("b", 20), ("a", 10)))
+    response_mock.add("GET", URL, match_querystring=False, status=204)
+    response_mock.add("GET", URL, match_querystring=False, json=_page(("b", 20), ("c", 20), ("d", 30)))
+    storage = MemoryStateStorage()
+
+    stream = Event.objects.stream(since=5, types=["lead_added"], storage=storage, max_interval=3)
+    assert [next(stream).id for _ in range(4)] == ["a", "b", "c", "d"]
+    stream.close()
+
+    queries = [parse_qs(urlparse(call.request.url).query) for call in response_mock.calls]
+    assert [query["filter[created_at][from]"] for query in queries] == [["5"], ["20"], ["20"]]
+    assert queries[0]["filter[type][]"] == ["lead_added"]
+    assert sleeps == [1, 2]
+    assert storage.get("events") == {"created_at": 20, "ids": ["b"]}
+
+
+def test_stream_resumed(response_mock, sleeps):
+    response_mock.add("GET", URL, match_querystring=False, json=_page(("b", 20), ("c", 20)))
+    storage = MemoryStateStorage()
+    storage.save("events", {"created_at": 20, "ids": ["b"]})
+
+    assert next(Event.objects.stream(storage=storage)).id == "c"
+
+
+def _callback(request):
+    query = parse_qs(urlparse(request.url).query)
+    assert query["limit"] == ["100"]
+    if query["page"] != ["1"]:
+        return 204, {}, ""
+    return 200, {}, json.dumps(_page(("a", 10), ("b", 20)))
+
+
+def test_filter_prefetch(response_mock):
+    response_mock.add_callback("GET", URL, callback=_callback)
+
+    assert [event.id for event in Event.objects.filter(prefetch=2)] == ["a", "b"]
+
+
+def test_filter_stream(response_mock):
+    response_mock.add_callback("GET", URL, callback=_callback)
+
+    assert [event.id for event in Event.objects.filter(stream=True)] == ["a", "b"]
+
+
+def test_filter_cursor(response_mock):
+    response_mock.add_callback("GET", URL, callback=_callback)
+    cursor = Cursor()
+
+    events = Event.objects.filter(cursor=cursor)
+    assert next(events).id == "a"
+    events.close()
+
+    cursor = Cursor.loads(cursor.dumps())
+    assert [event.id for event in Event.objects.filter(cursor=cursor)] == ["b"]
+    assert cursor.finished
@@ -0,0 +1,129 @@
+import csv
+import io
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from amocrm.v2 import Contact, Lead, custom_field, export
+from amocrm.v2.export import export_columns, partitioned_export
+
+CONTACTS = [{"id": i, "name": str(i), "created_at": 100 + i * 10} for i in range(11)]  # created_at from 100 to 200
+
+
+def _list_callback(request):
+    query = parse_qs(urlparse(request.url).query)
+    value_from, value_to = int(query["filter[created_at][from]"][0]), int(query["filter[created_at][to]"][0])
+    assert query["order[id]"] == ["asc"]
+    contacts = [item for item in CONTACTS if value_from <= item["created_at"] <= value_to]
+    if not contacts:
+        return 204, {}, ""
+    return 200, {}, Contact.objects._interaction._codec.dumps({"_embedded": {"contacts": contacts}})
+
+
+def test_partitioned_export(response_mock):
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/contacts", callback=_list_callback)
+
+    contacts = list(partitioned_export(Contact, 100, 200, partitions=4, workers=2))
+    assert [contact.id for contact in contacts] == [item["id"] for item in CONTACTS]
+    assert len(response_mock.calls) == 4
+
+
+def test_partitioned_export_records(response_mock):
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/contacts", callback=_list_callback)
+
+    contacts = list(partitioned_export(Contact, 150, 150, records=True))
+    assert [contact.name for contact in contacts] == ["5"]
+    assert len(response_mock.calls) == 1
+
+
+def test_partitioned_export_closed(response_mock, monkeypatch):
+    monkeypatch.setattr(export, "PARTITION_BUFFER_SIZE", 1)
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/contacts", callback=_list_callback)
+
+    contacts = partitioned_export(Contact, 100, 200, partitions=10, workers=1)
+    assert next(contacts).id == 0
+    contacts.close()
+    # the first partition is stopped and the queued one is never crawled
+    assert len(response_mock.calls) <= 2
+
+
+CUSTOM_FIELDS = {
+    "_embedded": {
+        "custom_fields": [
+            {"id": 1, "name": "Телефон", "type": "multitext", "sort": 1, "entity_type": "contacts"},
+            {
+                "id": 2,
+                "name": "Тип",
+                "type": "select",
+                "sort": 2,
+                "entity_type": "contacts",
+                "enums": [{"id": 10, "value": "Партнер"}],
+            },
+        ]
+    }
+}
+EXPORT_PAGE = {
+    "_embedded": {
+        "contacts": [
+            {
+                "id": 1,
+                "name": "Иван",
+                "created_at": 100,
+                "custom_fields_values": [
+                    {"field_id": 1, "values": [{"value": "+7900"}, {"value": "+7901"}]},
+                    {"field_id": 2, "values": [{"enum_id": 10}]},
+                ],
+            },
+            {"id": 2, "name": "Петр", "created_at": 200, "custom_fields_values": None},
+        ]
+    }
+}
+
+
+@pytest.fixture(name="export_mock")
+def _export_mock(response_mock):
+    custom_field.custom_fields_registry.invalidate()
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/contacts/custom_fields", match_querystring=False, json=CUSTOM_FIELDS
+    )
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=EXPORT_PAGE)
+    yield response_mock
+    custom_field.custom_fields_registry.invalidate()
+
+
+def test_export_columns_csv(export_mock):
+    output = io.StringIO()
+
+    assert export_columns(Contact, output, batch_size=1) == 2
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert [(row["id"], row["name"], row["created_at"]) for row in rows] == [("1", "Иван", "100"), ("2", "Петр", "200")]
+    assert (rows[0]["cf_1"], rows[0]["cf_2"], rows[1]["cf_1"]) == ("+7900; +7901", "Партнер", "")
+
+
+def test_export_columns_parquet(export_mock, tmpdir):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmpdir.join("contacts.parquet"))
+
+    assert export_columns(Contact, path) == 2
+    table = parquet.read_table(path)
+    assert table.column("name").to_pylist() == ["Иван", "Петр"]
+    assert table.column("cf_2").to_pylist() == ["Партнер", None]
+
+
+def test_export_columns_parquet_batches(response_mock, tmpdir):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    leads = [
+        {"id": 1, "name": "1", "price": 100, "closed_at": None, "loss_reason_id": None, "score": None},
+        {"id": 2, "name": "2", "price": 100.5, "closed_at": 1600000000, "loss_reason_id": 3, "score": 7},
+    ]
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/leads", match_querystring=False, json={"_embedded": {"leads": leads}}
+    )
+    path = str(tmpdir.join("leads.parquet"))
+
+    assert export_columns(Lead, path, batch_size=1, custom_fields=False) == 2
+    table = parquet.read_table(path)
+    assert table.column("closed_at").to_pylist() == [None, 1600000000]
+    assert table.column("loss_reason_id").to_pylist() == [None, 3]
+    assert table.column("price").to_pylist() == [100, 100.5]
+    assert table.column("score").to_pylist() == [None, "7"]
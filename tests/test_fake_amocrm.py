@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from amocrm.v2 import Contact
+from amocrm.v2.interaction import GenericInteraction
+from amocrm.v2.manager import Manager
+from amocrm.v2.tokens import MemoryTokensStorage, TokenManager
+
+from .fake_amocrm import FakeAmoCRM
+
+
+@pytest.fixture(name="server")
+def _server():
+    with FakeAmoCRM(entities={"contacts": 600}, custom_fields=10) as server:
+        yield server
+
+
+def _get_manager(server, refresh_before=60, **kwargs):
+    token_manager = TokenManager(refresh_before=refresh_before)
+    token_manager(
+        client_id="",
+        client_secret="",
+        subdomain="test",
+        redirect_url="",
+        storage=MemoryTokensStorage(),
+        base_url=server.base_url,
+    )
+    token_manager.init(code=server.code)
+    interaction = GenericInteraction(token_manager=token_manager, path="contacts", rate_limiter=None, **kwargs)
+    return Manager(interaction, model=Contact)
+
+
+def test_pagination(server):
+    contacts = list(_get_manager(server).all())
+
+    assert [contact.id for contact in contacts] == list(range(1, 601))
+    assert server.requests.count(("GET", "/api/v4/contacts")) == 3
+
+
+def test_filter_and_get(server):
+    manager = _get_manager(server)
+
+    assert [contact.id for contact in manager.get_many([3, 500])] == [3, 500]
+    assert manager.get(object_id=7).name == "Сущность 7"
+
+
+def test_bulk_create(server):
+    manager = _get_manager(server)
+
+    contacts = manager.bulk_create([Contact(name="new {}".format(i)) for i in range(300)])
+
+    assert [contact.id for contact in contacts] == list(range(601, 901))
+    assert server.entities["contacts"][900]["name"] == "new 299"
+
+
+def test_rate_limit_retry(server):
+    server.rate = 2
+    manager = _get_manager(server, backoff=0)
+
+    with ThreadPoolExecutor(4) as executor:
+        contacts = list(executor.map(lambda object_id: manager.get(object_id=object_id), range(1, 9)))
+
+    assert [contact.id for contact in contacts] == list(range(1, 9))
+    assert server.throttled
+
+
+def test_token_refresh(server):
+    server.token_lifetime = 1
+    manager = _get_manager(server, refresh_before=0)
+    manager.get(object_id=1)
+    time.sleep(1.1)
+
+    assert manager.get(object_id=2).id == 2
+    assert server.requests.count(("POST", "/oauth2/access_token")) == 2
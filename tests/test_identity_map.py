@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from amocrm.v2 import Contact, User
+from amocrm.v2.identity_map import IdentityMap, get_current_identity_map
+
+from .data.contacts import DETAIL_INFO
+from .data.users import DETAIL_INFO as USER_DETAIL_INFO
+
+
+@pytest.fixture(name="contact")
+def _contact():
+    return Contact(data=DETAIL_INFO)
+
+
+def test_without_identity_map(response_mock, contact):
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/users/3", match_querystring=False, json=USER_DETAIL_INFO)
+    assert contact.responsible_user.id == contact.created_by.id == 3
+    assert len(response_mock.calls) == 2
+
+
+def test_identity_map(response_mock, contact):
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/users/3", match_querystring=False, json=USER_DETAIL_INFO)
+    with IdentityMap() as identity_map:
+        assert get_current_identity_map() is identity_map
+        assert contact.responsible_user is contact.created_by
+    assert get_current_identity_map() is None
+    assert len(response_mock.calls) == 1
+
+
+def test_identity_map_eviction():
+    identity_map = IdentityMap(maxsize=2)
+    for i in range(3):
+        identity_map.set(i, User(data={"id": i}))
+    assert len(identity_map) == 2
+    assert identity_map.get(0) is None
+    assert identity_map.get(2).id == 2
+
+
+def test_identity_map_ttl():
+    identity_map = IdentityMap(ttl=0)
+    identity_map.set(1, User(data={"id": 1}))
+    assert identity_map.get(1) is None
+
+
+def test_identity_map_shared_between_threads():
+    identity_map, errors = IdentityMap(), []
+    entered, release = threading.Barrier(2), threading.Event()
+
+    def scope():
+        try:
+            with identity_map:
+                entered.wait()
+                release.wait()
+                assert get_current_identity_map() is identity_map
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    threads = [threading.Thread(target=scope) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert get_current_identity_map() is None
+
+
+def test_identity_map_nested():
+    outer, inner = IdentityMap(), IdentityMap()
+    with outer:
+        with inner:
+            assert get_current_identity_map() is inner
+        assert get_current_identity_map() is outer
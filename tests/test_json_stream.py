@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from amocrm.v2 import Contact
+from amocrm.v2.json_stream import iter_embedded
+
+from .data.contacts import LIST_PAGE_1, LIST_PAGE_2
+
+
+def _parse(raw, field, chunk_size):
+    generator = iter_embedded((raw[i : i + chunk_size] for i in range(0, len(raw), chunk_size)), field)
+    items = []
+    while True:
+        try:
+            items.append(next(generator))
+        except StopIteration as e:
+            return items, e.value
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64 * 1024])
+def test_iter_embedded(chunk_size):
+    raw = json.dumps({**LIST_PAGE_1, "_total": 12345}, ensure_ascii=False).encode()
+
+    items, rest = _parse(raw, "contacts", chunk_size)
+    assert items == LIST_PAGE_1["_embedded"]["contacts"]
+    assert rest["_links"] == LIST_PAGE_1["_links"]
+    assert rest["_total"] == 12345
+    assert "contacts" not in rest["_embedded"]
+
+
+def test_iter_embedded_broken_json():
+    with pytest.raises(ValueError):
+        _parse(b'{"_embedded": {"contacts": [{"id": 1}, {"id": ', "contacts", 4)
+
+
+def test_list_streamed(response_mock):
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=LIST_PAGE_1)
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=LIST_PAGE_2)
+
+    contacts = list(Contact.objects.filter(stream=True))
+    expected = LIST_PAGE_1["_embedded"]["contacts"] + LIST_PAGE_2["_embedded"]["contacts"]
+    assert [contact.id for contact in contacts] == [item["id"] for item in expected]
+    assert len(response_mock.calls) == 2
+
+
+def test_list_streamed_empty(response_mock):
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, status=204)
+
+    assert list(Contact.objects.filter(stream=True)) == []
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from amocrm.v2 import Company, Contact, Lead
+from amocrm.v2.links import LinksInteraction
+
+
+def _page(field, *ids):
+    return {"_embedded": {field: [{"id": _id, "name": str(_id)} for _id in ids]}}
+
+
+def test_list_link_batched(response_mock):
+    response_mock.add(
+        "GET",
+        "https://test.amocrm.ru/api/v4/contacts",
+        match_querystring=False,
+        json=_page("contacts", 7767065, 7143599),
+    )
+    company = Company(
+        data={"id": 1, "_embedded": {"contacts": [{"id": 7767065}, {"id": 7143599}]}},
+    )
+
+    assert [contact.id for contact in company.contacts] == [7767065, 7143599]
+    assert len(response_mock.calls) == 1
+    assert response_mock.calls[0].request.params["filter[id][]"] == ["7767065", "7143599"]
+
+
+def test_prefetch_related(response_mock):
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/leads", match_querystring=False, json=_page("leads", 1, 2, 3)
+    )
+    contacts = [
+        Contact(data={"id": 1, "_embedded": {"leads": [{"id": 1}, {"id": 2}]}}),
+        Contact(data={"id": 2, "_embedded": {"leads": [{"id": 3}, {"id": 1}]}}),
+        Contact(data={"id": 3, "_embedded": {"leads": []}}),
+    ]
+
+    Contact.objects.prefetch_related(contacts, "leads")
+
+    assert [[lead.id for lead in contact.leads] for contact in contacts] == [[1, 2], [3, 1], []]
+    assert len(response_mock.calls) == 1
+    assert isinstance(list(contacts[0].leads)[0], Lead)
+
+
+def test_prefetch_related_single_link(response_mock):
+    response_mock.add(
+        "GET",
+        "https://test.amocrm.ru/api/v4/companies",
+        match_querystring=False,
+        json={"_embedded": {"companies": [{"id": 1, "name": "first"}]}},
+    )
+    contacts = [
+        Contact(data={"id": 1, "_embedded": {"companies": [{"id": 1}]}}),
+        Contact(data={"id": 2, "_embedded": {"companies": []}}),
+    ]
+
+    Contact.objects.prefetch_related(contacts, "company")
+
+    assert contacts[0].company.name == "first"
+    assert contacts[1].company is None
+    assert len(response_mock.calls) == 1
+
+
+def test_prefetch_related_wrong_field():
+    with pytest.raises(TypeError):
+        Contact.objects.prefetch_related([], "name")
+    with pytest.raises(AttributeError):
+        Contact.objects.prefetch_related([], "unknown")
+
+
+def test_link_many(response_mock):
+    response_mock.add("POST", "https://test.amocrm.ru/api/v4/leads/link", json={"_embedded": {"links": []}})
+    response_mock.add("POST", "https://test.amocrm.ru/api/v4/contacts/link", json={"_embedded": {"links": []}})
+    leads = [Lead(data={"id": i}) for i in range(5)]
+    contact = Contact(data={"id": 10})
+
+    links = LinksInteraction()
+    links.link_many([(lead, contact) for lead in leads] + [(contact, Company(data={"id": 20}))], batch_size=3)
+
+    bodies = [(call.request.url, json.loads(call.request.body)) for call in response_mock.calls]
+    assert [url for url, _ in bodies] == [
+        "https://test.amocrm.ru/api/v4/leads/link",
+        "https://test.amocrm.ru/api/v4/leads/link",
+        "https://test.amocrm.ru/api/v4/contacts/link",
+    ]
+    assert bodies[0][1][0] == {"entity_id": 0, "to_entity_id": 10, "to_entity_type": "contacts", "metadata": None}
+    assert [len(body) for _, body in bodies] == [3, 2, 1]
+
+
+def test_list_extend(response_mock):
+    response_mock.add("POST", "https://test.amocrm.ru/api/v4/leads/link", json={"_embedded": {"links": []}})
+    lead = Lead(data={"id": 1})
+
+    lead.contacts.extend([Contact(data={"id": 10}), Contact(data={"id": 11})], main=True)
+    assert len(response_mock.calls) == 1
+    assert json.loads(response_mock.calls[0].request.body) == [
+        {"entity_id": 1, "to_entity_id": _id, "to_entity_type": "contacts", "metadata": {"is_main": True}}
+        for _id in (10, 11)
+    ]
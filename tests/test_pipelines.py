@@ -0,0 +1,67 @@
+import pytest
+
+from amocrm.v2 import Lead, exceptions
+from amocrm.v2.entity.pipeline import PipelinesRegistry, pipelines_registry
+
+URL = "https://test.amocrm.ru/api/v4/leads/pipelines"
+PIPELINES = {
+    "_embedded": {
+        "pipelines": [
+            {
+                "id": 1,
+                "name": "Продажи",
+                "_embedded": {
+                    "statuses": [
+                        {"id": 10, "name": "Первичный контакт", "pipeline_id": 1},
+                        {"id": 11, "name": "Переговоры", "pipeline_id": 1},
+                    ]
+                },
+            },
+            {
+                "id": 2,
+                "name": "Партнеры",
+                "_embedded": {"statuses": [{"id": 20, "name": "Переговоры", "pipeline_id": 2}]},
+            },
+        ]
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def _invalidate():
+    pipelines_registry.invalidate()
+    yield
+    pipelines_registry.invalidate()
+
+
+def test_lead_status(response_mock):
+    response_mock.add("GET", URL, match_querystring=False, json=PIPELINES)
+    leads = [Lead(data={"id": i, "pipeline_id": 1 + i % 2, "status_id": 10 + i % 2 * 10}) for i in range(10)]
+
+    assert [lead.status.id for lead in leads] == [10, 20] * 5
+    assert Lead(data={"id": 1, "pipeline_id": 1}).status is None
+    assert len(response_mock.calls) == 1
+
+
+def test_lead_set_status_by_name(response_mock):
+    response_mock.add("GET", URL, match_querystring=False, json=PIPELINES)
+    lead = Lead(data={"id": 1, "pipeline_id": 2, "status_id": 20})
+
+    with pytest.raises(exceptions.NotFound):
+        lead.status = "Первичный контакт"  # status of other pipeline, the index was just loaded and is not reloaded
+    lead = Lead(data={"id": 1, "pipeline_id": 1, "status_id": 11})
+    lead.status = "первичный контакт"
+    assert lead._data["status_id"] == 10
+    assert len(response_mock.calls) == 1
+
+
+def test_reload_on_miss(response_mock):
+    response_mock.add("GET", URL, match_querystring=False, json=PIPELINES)
+    registry = PipelinesRegistry(miss_reload_interval=0)
+
+    with pytest.raises(exceptions.NotFound):
+        registry.find_status(2, "Первичный контакт")
+    assert registry.get_status(2, 10) is None
+    assert len(response_mock.calls) == 3  # the first load and one reload per miss
+    assert registry.get_status(1, 10).name == "Первичный контакт"
+    assert len(response_mock.calls) == 3
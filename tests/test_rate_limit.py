@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from amocrm.v2 import Contact, exceptions
+from amocrm.v2.rate_limit import RateLimiter
+
+from .data.contacts import DETAIL_INFO
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter()
+    assert all(limiter.try_acquire() == 0 for _ in range(100))
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=5, period=0.1)
+    started = time.monotonic()
+    for _ in range(10):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+    assert limiter.try_acquire() > 0
+
+
+def test_rate_limiter_scoped():
+    limiter = RateLimiter(rate=1, period=10)
+    assert limiter.try_acquire("first") == 0
+    assert limiter.try_acquire("second") == 0
+    assert limiter.try_acquire("first") > 0
+
+
+def test_rate_limiter_shared():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    first, second = RateLimiter(rate=3, period=10, client=client), RateLimiter(rate=3, period=10, client=client)
+
+    assert [first.try_acquire("test"), second.try_acquire("test"), first.try_acquire("test")] == [0, 0, 0]
+    assert 0 < second.try_acquire("test") <= 10 / 3
+    assert first.try_acquire("other") == 0
+    assert client.exists("amocrm:rate:limit:test")
+
+
+def test_retry_too_many_requests(response_mock):
+    url = "https://test.amocrm.ru/api/v4/contacts/3"
+    response_mock.add("GET", url, match_querystring=False, status=429, headers={"Retry-After": "0"})
+    response_mock.add("GET", url, match_querystring=False, status=503, headers={"Retry-After": "0"})
+    response_mock.add("GET", url, match_querystring=False, json=DETAIL_INFO)
+
+    assert Contact.objects.get(3).id == 3
+    assert len(response_mock.calls) == 3
+
+
+def test_retry_exhausted(response_mock):
+    response_mock.add(
+        "GET",
+        "https://test.amocrm.ru/api/v4/contacts/3",
+        match_querystring=False,
+        status=429,
+        headers={"Retry-After": "0"},
+    )
+    with pytest.raises(exceptions.TooManyRequests):
+        Contact.objects.get(3)
+    assert len(response_mock.calls) == 4
+
+
+def test_no_retry_for_create(response_mock):
+    response_mock.add("POST", "https://test.amocrm.ru/api/v4/contacts", status=502)
+    with pytest.raises(exceptions.AmoApiException):
+        Contact.objects.create(name="test")
+    assert len(response_mock.calls) == 1
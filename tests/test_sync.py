@@ -0,0 +1,83 @@
+from urllib.parse import parse_qs, urlparse
+
+from amocrm.v2 import Contact
+from amocrm.v2.state import FileStateStorage
+from amocrm.v2.sync import IncrementalSync
+
+from .data.contacts import LIST_PAGE_2
+
+
+def _event(event_id, event_type, entity_id, created_at):
+    return {
+        "id": event_id,
+        "type": event_type,
+        "entity_id": entity_id,
+        "entity_type": "contact",
+        "created_at": created_at,
+        "value_after": [],
+        "value_before": [],
+    }
+
+
+def _query(call):
+    return parse_qs(urlparse(call.request.url).query)
+
+
+def test_incremental_sync(response_mock, tmpdir):
+    sync = IncrementalSync(Contact, storage=FileStateStorage(str(tmpdir)))
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=LIST_PAGE_2)
+
+    changes = list(sync.changes())
+    assert [contact.id for contact in changes[0].updated] == [
+        item["id"] for item in LIST_PAGE_2["_embedded"]["contacts"]
+    ]
+    assert changes[0].deleted == []
+    assert "filter[updated_at][from]" not in _query(response_mock.calls[0])
+    mark = sync.get_mark()
+    assert mark
+
+    response_mock.reset()
+    response_mock.add(
+        "GET",
+        "https://test.amocrm.ru/api/v4/events",
+        match_querystring=False,
+        json={
+            "_embedded": {
+                "events": [
+                    _event("c", "contact_restored", 7, 30),
+                    _event("b", "contact_deleted", 7, 20),
+                    _event("a", "entity_merged", 5, 10),
+                ]
+            }
+        },
+    )
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=LIST_PAGE_2)
+    response_mock.add(
+        "GET",
+        "https://test.amocrm.ru/api/v4/contacts",
+        match_querystring=False,
+        json={"_embedded": {"contacts": [{"id": 7, "name": "restored"}]}},
+    )
+
+    sync = IncrementalSync(Contact, storage=FileStateStorage(str(tmpdir)), overlap=10)
+    changes = list(sync.changes())
+    assert len(changes) == 1
+    assert changes[0].deleted == [5]
+    assert [contact.id for contact in changes[0].updated] == [
+        item["id"] for item in LIST_PAGE_2["_embedded"]["contacts"]
+    ] + [7]
+
+    events_query, contacts_query = _query(response_mock.calls[0]), _query(response_mock.calls[1])
+    assert events_query["filter[type][]"] == ["contact_deleted", "contact_restored", "entity_merged"]
+    assert contacts_query["filter[updated_at][from]"] == [str(mark - 10)]
+    assert sync.get_mark() >= mark
+
+
+def test_incremental_sync_not_finished(response_mock):
+    sync = IncrementalSync(Contact, batch_size=1)
+    response_mock.add("GET", "https://test.amocrm.ru/api/v4/contacts", match_querystring=False, json=LIST_PAGE_2)
+
+    changes = sync.changes()
+    assert len(next(changes).updated) == 1
+    changes.close()
+    assert sync.get_mark() is None
@@ -0,0 +1,114 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import pytest
+
+from amocrm.v2 import Contact, exceptions
+from amocrm.v2.tokens import MemoryTokensStorage, TokenManager
+
+from .data.contacts import DETAIL_INFO
+
+
+def _token(expire_in):
+    token = jwt.encode({"exp": int(time.time()) + expire_in}, "tests")
+    if isinstance(token, bytes):
+        return token.decode()
+    return token
+
+
+class CountingStorage(MemoryTokensStorage):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_access_token(self):
+        self.reads += 1
+        return super().get_access_token()
+
+
+@pytest.fixture(name="storage")
+def _storage():
+    return CountingStorage()
+
+
+@pytest.fixture(name="token_manager")
+def _token_manager(storage):
+    manager = TokenManager()
+    manager(client_id="", client_secret="", subdomain="test", redirect_url="", storage=storage)
+    return manager
+
+
+def test_no_token(token_manager):
+    with pytest.raises(exceptions.NoToken):
+        token_manager.get_access_token()
+
+
+def test_access_token_cached(token_manager, storage):
+    token = _token(600)
+    storage.save_tokens(token, "refresh")
+
+    assert token_manager.get_access_token() == token
+    assert token_manager.get_access_token() == token
+    assert storage.reads == 1
+
+    token_manager.reset_cache()
+    assert token_manager.get_access_token() == token
+    assert storage.reads == 2
+
+
+def test_expired_token_refreshed(token_manager, storage, response_mock):
+    new_token = _token(600)
+    storage.save_tokens(_token(-10), "refresh")
+    response_mock.add(
+        "POST",
+        "https://test.amocrm.ru/oauth2/access_token",
+        json={"access_token": new_token, "refresh_token": "new refresh"},
+    )
+
+    assert token_manager.get_access_token() == new_token
+    assert storage.get_refresh_token() == "new refresh"
+    assert token_manager.get_access_token() == new_token
+    assert len(response_mock.calls) == 1
+
+
+def test_refresh_single_flight(token_manager, storage, response_mock):
+    new_token = _token(600)
+    storage.save_tokens(_token(-10), "refresh")
+
+    def callback(request):
+        time.sleep(0.05)
+        return 200, {}, json.dumps({"access_token": new_token, "refresh_token": "new refresh"})
+
+    response_mock.add_callback("POST", "https://test.amocrm.ru/oauth2/access_token", callback=callback)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: token_manager.get_access_token(), range(8)))
+
+    assert results == [new_token] * 8
+    assert len(response_mock.calls) == 1
+
+
+def test_refresh_before_expiration(token_manager, storage, response_mock):
+    old_token, new_token = _token(30), _token(600)
+    storage.save_tokens(old_token, "refresh")
+    response_mock.add("POST", "https://test.amocrm.ru/oauth2/access_token", status=500, json={})
+
+    assert token_manager.get_access_token() == old_token  # refresh failed, but token is still valid
+
+    token_manager.reset_cache()
+    response_mock.replace(
+        "POST",
+        "https://test.amocrm.ru/oauth2/access_token",
+        json={"access_token": new_token, "refresh_token": "new refresh"},
+    )
+    assert token_manager.get_access_token() == new_token
+
+
+def test_unauthorized_retried_with_fresh_token(response_mock):
+    url = "https://test.amocrm.ru/api/v4/contacts/3"
+    response_mock.add("GET", url, match_querystring=False, status=401)
+    response_mock.add("GET", url, match_querystring=False, json=DETAIL_INFO)
+
+    assert Contact.objects.get(3).id == 3
+    assert len(response_mock.calls) == 2
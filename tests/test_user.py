@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from amocrm.v2 import exceptions
@@ -16,3 +18,24 @@ def test_get(response_mock):
     assert user.language == "ru"
     assert not user.is_admin
     assert user.is_active
+
+
+def test_filter_query_prefetch(response_mock):
+    def callback(request):
+        if request.params["page"] != "1":
+            return 204, {}, ""
+        users = [DETAIL_INFO, {**DETAIL_INFO, "id": 4, "name": "Иван"}]
+        return 200, {}, json.dumps({"_embedded": {"users": users}})
+
+    response_mock.add_callback("GET", "https://test.amocrm.ru/api/v4/users", callback=callback)
+
+    assert [user.id for user in User.objects.filter(query="Иван", prefetch=2)] == [4]
+
+
+def test_filter_query_stream(response_mock):
+    users = [DETAIL_INFO, {**DETAIL_INFO, "id": 4, "name": "Иван"}]
+    response_mock.add(
+        "GET", "https://test.amocrm.ru/api/v4/users", match_querystring=False, json={"_embedded": {"users": users}}
+    )
+
+    assert [user.id for user in User.objects.filter(query="Иван", stream=True)] == [4]
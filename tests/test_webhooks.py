@@ -0,0 +1,81 @@
+import threading
+from urllib.parse import urlencode
+
+from amocrm.v2 import Company, Lead, custom_field, webhooks
+
+LEAD_STATUS = urlencode(
+    {
+        "leads[status][0][id]": "25399013",
+        "leads[status][0][name]": "Сделка",
+        "leads[status][0][status_id]": "142",
+        "leads[status][0][pipeline_id]": "1",
+        "leads[status][0][price]": "100",
+        "leads[status][0][last_modified]": "1613471212",
+        "leads[status][0][custom_fields][0][id]": "427495",
+        "leads[status][0][custom_fields][0][name]": "UTM",
+        "leads[status][0][custom_fields][0][values][0][value]": "google",
+        "leads[status][1][id]": "25399014",
+        "account[subdomain]": "test",
+        "account[id]": "29085955",
+    }
+)
+COMPANY_ADD = urlencode(
+    {"contacts[add][0][id]": "5", "contacts[add][0][type]": "company", "contacts[add][0][name]": "Amo"}
+)
+
+
+class LeadWithUtm(Lead):
+    utm = custom_field.TextCustomField("UTM")
+
+
+def test_parse():
+    payload = webhooks.parse(LEAD_STATUS.encode())
+    assert payload["account"] == {"subdomain": "test", "id": "29085955"}
+    assert [item["id"] for item in payload["leads"]["status"]] == ["25399013", "25399014"]
+    assert payload["leads"]["status"][0]["custom_fields"][0]["values"] == [{"value": "google"}]
+
+
+def test_events():
+    events = webhooks.get_events(webhooks.parse(LEAD_STATUS), models={"leads": LeadWithUtm})
+    lead = events[0].instance
+    assert (events[0].entity_type, events[0].action, events[0].account["subdomain"]) == ("leads", "status", "test")
+    assert isinstance(lead, LeadWithUtm)
+    assert (lead.id, lead.name, lead.price, lead.updated_at.year) == (25399013, "Сделка", 100, 2021)
+    assert lead._data["status_id"] == 142
+    assert lead.utm == "google"
+
+    (event,) = webhooks.get_events(webhooks.parse(COMPANY_ADD))
+    assert event.entity_type == "companies" and isinstance(event.instance, Company)
+
+
+def test_dispatcher():
+    dispatcher = webhooks.WebhookDispatcher(batch_size=3, flush_interval=60)
+    batches, all_events = [], []
+    dispatcher.on("leads", "status")(batches.append)
+    dispatcher.on()(all_events.extend)
+
+    dispatcher.feed(LEAD_STATUS)
+    assert batches == []
+    dispatcher.feed(COMPANY_ADD)
+    assert [[event.instance.id for event in batch] for batch in batches] == [[25399013, 25399014]]
+    assert len(all_events) == 3
+
+    dispatcher.feed(COMPANY_ADD)
+    dispatcher.flush()
+    assert len(batches) == 1 and len(all_events) == 4
+
+
+def test_dispatcher_flush_interval():
+    dispatcher = webhooks.WebhookDispatcher(batch_size=100, flush_interval=0.05)
+    flushed = threading.Event()
+    batches = []
+    dispatcher.on()(lambda events: batches.append(events) or flushed.set())
+
+    dispatcher.feed(LEAD_STATUS)
+    assert batches == []
+    assert flushed.wait(1)  # no more webhooks, the batch is passed by the timer
+    assert len(batches[0]) == 2
+
+    dispatcher.feed(COMPANY_ADD)
+    dispatcher.close()
+    assert len(batches) == 2